@@ -1,6 +1,7 @@
 import streamlit as st
 import requests
 from styles import GLOBAL_STYLE
+import gazetteer
 
 # -----------------------
 # Config
@@ -31,28 +32,14 @@ VILLES_PREDEFINIES = {
 
 def geocode_city(city_name):
     """
-    Géocode une ville en utilisant Photon API (alternative plus fiable que Nominatim).
-    Photon est basé sur les données OpenStreetMap mais sans rate limiting strict.
+    Géocode une ville : index local des villes (gazetteer.py) sans appel réseau,
+    puis Photon (OpenStreetMap) uniquement pour les villes absentes de l'index.
     """
     try:
-        # Utilisation de Photon API - plus fiable pour les déploiements cloud
-        url = "https://photon.komoot.io/api/"
-        params = {
-            "q": city_name,
-            "limit": 1,
-            "lang": "fr"
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("features") and len(data["features"]) > 0:
-            coordinates = data["features"][0]["geometry"]["coordinates"]
-            # Photon renvoie [longitude, latitude], on inverse
-            return coordinates[1], coordinates[0]
-        
+        coords = gazetteer.geocode_city(city_name)
+        if coords is not None:
+            return coords
+
         st.warning(f"Ville '{city_name}' non trouvée. Essayez un autre nom.")
         return None
         
@@ -95,8 +82,31 @@ ville_selectionnee = None
 
 # --------------------------------------------------------
 # 1️⃣ Si l'utilisateur tape une ville → Géocodage automatique
+#    (suggestions locales si le nom exact n'est pas dans l'index des villes,
+#    ou s'il désigne plusieurs villes : Saint-Denis, Valence...)
 # --------------------------------------------------------
 if ville_input:
+    homonyms = gazetteer.get_gazetteer().homonyms(ville_input)
+    if len(homonyms) > 1:
+        suggestions = homonyms
+    else:
+        suggestions = [] if homonyms else gazetteer.suggest_cities(ville_input)
+    search_online = not suggestions
+
+    if suggestions:
+        st.markdown("**💡 Vouliez-vous dire :**")
+        suggestion_cols = st.columns(4)
+        for i, suggestion in enumerate(suggestions):
+            with suggestion_cols[i % 4]:
+                label = f"📍 {suggestion['name']} ({suggestion['country']})"
+                if st.button(label, key=f"suggest_{i}_{suggestion['name']}", use_container_width=True):
+                    st.session_state.latitude = suggestion["lat"]
+                    st.session_state.longitude = suggestion["lon"]
+                    st.session_state.ville_selectionnee = suggestion["name"]
+                    st.switch_page("pages/1_Données météo.py")
+        search_online = st.button(f"🌐 Rechercher « {ville_input} » en ligne", key="search_online")
+
+if ville_input and search_online:
     with st.spinner("🔍 Recherche de la ville en cours..."):
         coords = geocode_city(ville_input)
 
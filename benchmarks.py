@@ -0,0 +1,483 @@
+"""
+Banc de performances hors ligne du tableau de bord.
+
+Mesure, sur des fixtures Open-Meteo rejouées (cf. openmeteo_replay.py) :
+- weather.*  : décodage FlatBuffers + conversion (_parse_weather_response),
+               get_weather_data complet, conversion au format liste de dictionnaires ;
+- view.*     : vue préparée des onglets (weather_views.py) : construction, payée une
+               fois par version de prévision, et relecture mémorisée d'un rerun ;
+- chart.*    : construction de chaque graphique (charts.py) : spécification Vega-Lite
+               pour Altair, rendu PNG (chart_cache.render_figure) pour matplotlib, et
+               relecture des graphiques matplotlib depuis le cache d'images (cache_hit) ;
+- page.*     : rendu des 9 graphiques matplotlib de la page, en série (charts_serial)
+               ou en parallèle sur CHART_RENDER_WORKERS processus, 2 au moins (charts_parallel) ;
+- agent.*    : _aggregate_hourly_by_period (colonnaire et liste de dictionnaires) ;
+- reco.*     : extraction des indicateurs de generate_recommendations (LLM simulé) ;
+- geo.*      : construction de l'index de suggestions de villes (temps et pic mémoire)
+               et suggestions pour des saisies approximatives, sur GAZETTEER_PATH
+               (data/cities.tsv, ou un export GeoNames cities15000.txt).
+
+Usage :
+    python benchmarks.py                          # mesure et compare à la référence si elle existe
+    python benchmarks.py --save                   # enregistre les mesures comme référence JSON
+    python benchmarks.py --check --threshold 0.25 # code de sortie 1 si un cas régresse de plus de 25 %
+    python benchmarks.py -k chart --repeat 50     # sous-ensemble de cas
+    python benchmarks.py --fixtures fixtures/     # fixtures enregistrées (record) au lieu de synthétiques
+
+La comparaison porte sur la médiane ; un écart absolu inférieur à BENCH_MIN_DELTA_MS
+n'est jamais compté comme régression (bruit de mesure des cas très courts).
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from functools import partial
+from unittest import mock
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+BENCH_BASELINE_PATH = os.getenv("BENCH_BASELINE_PATH", os.path.join(ROOT, "benchmarks_baseline.json"))
+BENCH_THRESHOLD = float(os.getenv("BENCH_THRESHOLD", "0.25"))  # régression tolérée (0.25 = +25 %)
+BENCH_MIN_DELTA_MS = float(os.getenv("BENCH_MIN_DELTA_MS", "0.05"))
+BENCH_REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+
+BENCH_LATITUDE, BENCH_LONGITUDE = 48.8566, 2.3522
+
+
+# ------------------------
+# Registre des cas
+# ------------------------
+BENCHMARKS = {}
+
+def benchmark(name, repeat=None, memory=False):
+    """
+    Enregistre un cas. La fonction décorée reçoit le BenchContext et renvoie la
+    fonction à chronométrer, ou (fonction, setup) si un setup non chronométré
+    doit précéder chaque mesure. `memory` : relever aussi le pic d'allocation
+    d'une exécution (tracemalloc, hors chronométrage).
+    """
+    def register(factory):
+        BENCHMARKS[name] = (factory, repeat, memory)
+        return factory
+    return register
+
+
+def peak_memory(func, setup=None):
+    """Pic de mémoire allouée (Kio) pendant une exécution de `func`."""
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def measure(func, repeat=BENCH_REPEAT, setup=None, warmup=1):
+    """
+    Chronomètre `func` `repeat` fois (après `warmup` exécutions) ; durées en millisecondes.
+    Le ramasse-miettes est suspendu pendant les mesures, comme dans timeit.
+    """
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+    samples = []
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "repeat": repeat,
+    }
+
+
+# ------------------------
+# Contexte : fixtures rejouées
+# ------------------------
+class BenchContext:
+    """
+    Données partagées par les cas : fixtures rejouées, prévision de référence
+    (colonnaire et liste de dictionnaires).
+
+    Parameters:
+    fixtures (str): Répertoire de fixtures (None = fixtures synthétiques temporaires)
+    """
+
+    def __init__(self, fixtures=None):
+        import forecast_cache
+        import forecast_store
+        import openmeteo_replay
+        import requete_page1 as rp
+
+        if fixtures is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="bench_fixtures_")
+            fixtures = self._tmp.name
+            openmeteo_replay.synthesize_fixtures([(BENCH_LATITUDE, BENCH_LONGITUDE)], fixtures, seed=0)
+        self.fixtures = openmeteo_replay.FixtureSet(fixtures)
+
+        # Ni cache persistant ni historique : chaque mesure de get_weather_data interroge le rejeu
+        forecast_cache.configure_forecast_cache(backend="none")
+        forecast_store.configure_forecast_store(enabled=False)
+        self.replay = openmeteo_replay.install_replay(self.fixtures)
+
+        self.rp = rp
+        self.cache = forecast_cache.get_forecast_cache()
+        self.params = rp._weather_params(BENCH_LATITUDE, BENCH_LONGITUDE, rp._resolve_fields())
+        self.payload = self.fixtures.payload(self.params)
+        self.weather_data = rp.get_weather_data(BENCH_LATITUDE, BENCH_LONGITUDE, columnar=True)
+        self.hourly_records = list(self.weather_data["hourly"].records())
+        self.date_str = self.weather_data["hourly"].time_index[0].strftime("%Y-%m-%d")
+
+    def close(self):
+        import requete_page1 as rp
+
+        rp.close_http_clients()
+        if getattr(self, "chart_executor", None) is not None:
+            self.chart_executor.shutdown()
+        if getattr(self, "_tmp", None) is not None:
+            self._tmp.cleanup()
+
+
+# ------------------------
+# Prévisions
+# ------------------------
+def _decode(payload):
+    from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+
+    # Message préfixé par sa longueur (uint32), comme renvoyé par l'API
+    return WeatherApiResponse.GetRootAs(payload, 4)
+
+@benchmark("weather.decode_parse", memory=True)
+def _bench_decode_parse(ctx):
+    return lambda: ctx.rp._parse_weather_response(_decode(ctx.payload))
+
+@benchmark("weather.get_weather_data", memory=True)
+def _bench_get_weather_data(ctx):
+    # Cache vidé avant chaque mesure : requête rejouée + parsing + mise en cache
+    return (lambda: ctx.rp.get_weather_data(BENCH_LATITUDE, BENCH_LONGITUDE, columnar=True)), ctx.cache.clear
+
+@benchmark("weather.records", memory=True)
+def _bench_records(ctx):
+    return lambda: list(ctx.weather_data["hourly"].records())
+
+
+# ------------------------
+# Vue préparée des onglets (weather_views.py)
+# ------------------------
+@benchmark("view.prepare", memory=True)
+def _bench_view_prepare(ctx):
+    # Coût payé une seule fois par version de prévision, toutes sessions confondues
+    from weather_views import prepare_view
+
+    return lambda: prepare_view(ctx.weather_data)
+
+@benchmark("view.rerun")
+def _bench_view_rerun(ctx):
+    # Rerun d'une page : vue mémorisée sur l'entrée partagée du bail, aucun prétraitement
+    from forecast_share import SharedForecastCache
+    from weather_views import get_prepared_view
+
+    lease = SharedForecastCache().acquire("bench", 0, lambda: ctx.weather_data)
+    get_prepared_view(lease)
+    return lambda: get_prepared_view(lease)
+
+
+# ------------------------
+# Graphiques
+# ------------------------
+def _altair(build):
+    # st.altair_chart sérialise la spécification (données incluses)
+    return lambda: build().to_dict()
+
+def _pyplot(chart, args):
+    # Rendu d'un graphique absent du cache d'images (construction de la Figure + PNG)
+    from chart_cache import render_charts
+
+    return lambda: render_charts([(chart, args)])
+
+# Graphiques matplotlib de la page (nom dans charts.py -> arguments tirés de la vue), dans l'ordre d'affichage
+PAGE_CHART_ARGS = {
+    "temperature_humidity": lambda v: (v.hourly,),
+    "wind_rose": lambda v: (v.hourly["wind_direction_10m"].dropna(), v.hourly["wind_speed_10m"].dropna()),
+    "wind": lambda v: (v.hourly,),
+    "precipitation_timeline": lambda v: (v.hourly,),
+    "humidity": lambda v: (v.hourly,),
+    "daylight": lambda v: (v.daily.iloc[:7],),
+    "uv": lambda v: (v.hourly,),
+    "comfort": lambda v: (v.hourly,),
+    "temperature_heatmap": lambda v: (v.heatmap,),
+}
+
+def _chart_jobs(v):
+    return [(chart, args(v)) for chart, args in PAGE_CHART_ARGS.items()]
+
+def _chart_cases():
+    import charts
+
+    cases = {
+        "chart.temperature_duo": lambda ctx, v: _altair(lambda: charts.line_chart_temp_duo(
+            v.table[["Heure", "Température (°C)", "Ressenti (°C)"]], "Heure", "Température (°C)", "Ressenti (°C)")),
+        "chart.rain_line": lambda ctx, v: _altair(lambda: charts.line_chart(
+            v.table[["Heure", "Pluie (%)"]], "Heure", "Pluie (%)", "Probabilité de pluie (%)")),
+        "chart.week": lambda ctx, v: _altair(lambda: charts.chart_7days(v.forecast)),
+    }
+    for chart, args in PAGE_CHART_ARGS.items():
+        cases[f"chart.{chart}"] = lambda ctx, v, chart=chart, args=args: _pyplot(chart, args(v))
+    return cases
+
+def _prepared(ctx):
+    if not hasattr(ctx, "view"):
+        from weather_views import prepare_view
+
+        ctx.view = prepare_view(ctx.weather_data)
+    return ctx.view
+
+def _register_chart(name, make):
+    @benchmark(name, repeat=max(3, BENCH_REPEAT // 4))
+    def _bench_chart(ctx):
+        return make(ctx, _prepared(ctx))
+
+for _name, _make in _chart_cases().items():
+    _register_chart(_name, _make)
+
+@benchmark("chart.cache_hit")
+def _bench_chart_cache_hit(ctx):
+    # Rerun (ou autre session) sur la même version : graphiques matplotlib relus du cache d'images
+    from chart_cache import ChartCache
+
+    view = _prepared(ctx)
+    cache = ChartCache()
+    jobs = _chart_jobs(view)
+    cache.render_many(view.digest, jobs)
+    return lambda: cache.render_many(view.digest, jobs)
+
+
+# ------------------------
+# Rendu des graphiques de la page : en série ou en parallèle (chart_cache.render_charts)
+# ------------------------
+@benchmark("page.charts_serial", repeat=max(3, BENCH_REPEAT // 4))
+def _bench_page_charts_serial(ctx):
+    # Les 9 graphiques matplotlib rendus l'un après l'autre dans le thread du script (cache vide)
+    from chart_cache import render_charts
+
+    jobs = _chart_jobs(_prepared(ctx))
+    return lambda: render_charts(jobs)
+
+@benchmark("page.charts_parallel", repeat=max(3, BENCH_REPEAT // 4))
+def _bench_page_charts_parallel(ctx):
+    # Les mêmes graphiques répartis sur CHART_RENDER_WORKERS processus, 2 au moins (pool démarré hors mesure)
+    from chart_cache import CHART_RENDER_WORKERS, create_chart_executor, render_charts
+
+    jobs = _chart_jobs(_prepared(ctx))
+    ctx.chart_executor = create_chart_executor(max(2, CHART_RENDER_WORKERS))
+    render_charts(jobs, executor=ctx.chart_executor)
+    return lambda: render_charts(jobs, executor=ctx.chart_executor)
+
+
+# ------------------------
+# Géocodage : index de suggestions (gazetteer.py)
+# ------------------------
+# Saisies approximatives typiques (fautes, abréviations, préfixes)
+BENCH_SUGGEST_QUERIES = ("Marseile", "st eti", "londr", "Bordo", "pa", "new yrk", "munchen", "Tolouse")
+
+@benchmark("geo.suggest_build", repeat=max(1, BENCH_REPEAT // 4), memory=True)
+def _bench_suggest_build(ctx):
+    from gazetteer import Gazetteer, SuggestIndex
+
+    index = Gazetteer()._load()
+    return lambda: SuggestIndex(index)
+
+@benchmark("geo.suggest")
+def _bench_suggest(ctx):
+    from gazetteer import Gazetteer
+
+    gazetteer = Gazetteer()
+    gazetteer.suggest_index()
+
+    def run():
+        # Toutes les saisies de BENCH_SUGGEST_QUERIES (durée par saisie = médiane / 8)
+        for query in BENCH_SUGGEST_QUERIES:
+            gazetteer.suggest(query)
+    return run
+
+
+# ------------------------
+# Agent et recommandations
+# ------------------------
+@benchmark("agent.aggregate_frame")
+def _bench_aggregate_frame(ctx):
+    from chat_agent import _aggregate_hourly_by_period
+
+    return lambda: _aggregate_hourly_by_period(ctx.weather_data["hourly"], ctx.date_str)
+
+@benchmark("agent.aggregate_records")
+def _bench_aggregate_records(ctx):
+    from chat_agent import _aggregate_hourly_by_period
+
+    return lambda: _aggregate_hourly_by_period(ctx.hourly_records, ctx.date_str)
+
+
+class _FakeChatGroq:
+    """LLM simulé : réponse immédiate, pour ne mesurer que l'extraction des indicateurs."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def invoke(self, messages):
+        from langchain_core.messages import AIMessage
+
+        return AIMessage(content="### 🏃 Activités\n- Réponse simulée")
+
+@benchmark("reco.generate_recommendations")
+def _bench_generate_recommendations(ctx):
+    import recommendations_generator
+
+    def run():
+        result = recommendations_generator.generate_recommendations(ctx.weather_data, "Paris")
+        if not result.get("success"):
+            raise RuntimeError(result.get("error"))
+    return run
+
+
+# ------------------------
+# Références JSON
+# ------------------------
+def load_baseline(path=BENCH_BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+def save_baseline(results, path=BENCH_BASELINE_PATH):
+    """Fusionne les mesures dans le fichier de référence (les cas non mesurés sont conservés)."""
+    merged = load_baseline(path)
+    merged.update(results)
+    payload = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": dict(sorted(merged.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
+def compare(results, baseline, threshold=BENCH_THRESHOLD, min_delta_ms=BENCH_MIN_DELTA_MS):
+    """
+    Compare les médianes aux références.
+
+    Returns:
+    list: Lignes (nom, médiane, référence ou None, écart relatif ou None, régression)
+    """
+    rows = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            rows.append((name, result["median_ms"], None, None, False))
+            continue
+        base = reference["median_ms"]
+        delta = (result["median_ms"] - base) / base if base else 0.0
+        regressed = delta > threshold and result["median_ms"] - base > min_delta_ms
+        rows.append((name, result["median_ms"], base, delta, regressed))
+    return rows
+
+
+def run(pattern=None, repeat=None, fixtures=None):
+    """Exécute les cas dont le nom contient `pattern` ; renvoie {nom: mesures}."""
+    ctx = BenchContext(fixtures)
+    results = {}
+    try:
+        with ExitStack() as stack:
+            import recommendations_generator
+
+            stack.enter_context(mock.patch.object(recommendations_generator, "ChatGroq", _FakeChatGroq))
+            stack.enter_context(mock.patch.dict(os.environ, {"GROQ_API_KEY": "benchmark"}))
+            for name, (factory, case_repeat, memory) in BENCHMARKS.items():
+                if pattern and pattern not in name:
+                    continue
+                case = factory(ctx)
+                func, setup = case if isinstance(case, tuple) else (case, None)
+                results[name] = measure(func, repeat or case_repeat or BENCH_REPEAT, setup=setup)
+                if memory:
+                    results[name]["peak_kib"] = peak_memory(func, setup=setup)
+    finally:
+        ctx.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de performances hors ligne du tableau de bord")
+    parser.add_argument("-k", dest="pattern", help="Ne lancer que les cas dont le nom contient ce motif")
+    parser.add_argument("--repeat", type=int, help=f"Mesures par cas (défaut {BENCH_REPEAT}, /4 pour les graphiques)")
+    parser.add_argument("--fixtures", help="Répertoire de fixtures Open-Meteo (défaut : fixtures synthétiques)")
+    parser.add_argument("--baseline", default=BENCH_BASELINE_PATH, help="Fichier JSON de référence")
+    parser.add_argument("--save", action="store_true", help="Enregistrer les mesures comme référence")
+    parser.add_argument("--check", action="store_true", help="Code de sortie 1 en cas de régression")
+    parser.add_argument("--threshold", type=float, default=BENCH_THRESHOLD, help="Régression tolérée (0.25 = +25 %%)")
+    parser.add_argument("--output", help="Écrire aussi les mesures brutes dans ce fichier JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.pattern, args.repeat, args.fixtures)
+    baseline = {} if args.save else load_baseline(args.baseline)
+    rows = compare(results, baseline, args.threshold)
+
+    width = max(len(name) for name in results) if results else 10
+    print(f"{'cas':<{width}}  {'médiane':>10}  {'référence':>10}  {'écart':>8}")
+    for name, median, base, delta, regressed in rows:
+        base_txt = f"{base:.3f}" if base is not None else "—"
+        delta_txt = f"{delta:+.0%}" if delta is not None else "nouveau"
+        flag = "  ❌" if regressed else ""
+        peak = results[name].get("peak_kib")
+        peak_txt = f"  pic {peak:.0f} Kio" if peak is not None else ""
+        print(f"{name:<{width}}  {median:>10.3f}  {base_txt:>10}  {delta_txt:>8}{peak_txt}{flag}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2)
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"💾 Référence enregistrée : {args.baseline}")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0%} : {', '.join(regressions)}")
+        if args.check:
+            return 1
+    elif baseline:
+        print(f"✅ Aucune régression au-delà de {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+"""
+Cache des graphiques matplotlib rendus, partagé par les sessions du processus.
+
+Une image est identifiée par ce qu'elle représente : (type de graphique, empreinte de
+la version de la prévision, format, résolution) ; les couleurs des figures de charts.py
+ne dépendent pas du thème de la page, une même image sert les thèmes clair et sombre.
+La première session qui l'affiche construit la Figure (API objet de charts.py, sans
+l'état global de pyplot) et la rastérise ; les reruns et les autres sessions relisent
+directement les octets.
+
+- PNG par défaut (CHART_IMAGE_FORMAT=svg pour du vectoriel), même rendu que st.pyplot
+  (bbox_inches="tight", CHART_DPI).
+- LRU borné par CHART_CACHE_MAX_BYTES ; une nouvelle version de la prévision change
+  l'empreinte, les anciennes images sortent du cache au fil des évictions.
+- Onglets à plusieurs graphiques : sur option (CHART_RENDER_WORKERS >= 2, 0 par défaut),
+  les images manquantes sont rendues en parallèle (render_many) dans un pool de processus,
+  la rastérisation Agg ne libérant pas le GIL ; sinon rendu en série dans le thread du script.
+  Désactivé par défaut : sur un hôte à un ou deux cœurs, le démarrage des workers et le
+  transfert des arguments coûtent plus que le rendu gagné, et chaque worker ajoute sa
+  propre copie de matplotlib en mémoire.
+  Si le pool ne rend pas tout en CHART_RENDER_TIMEOUT secondes, ses workers sont tués et
+  les images manquantes sont rendues en série.
+  Les workers sont lancés sur le point d'entrée de ce module (python chart_cache.py --worker) :
+  ils n'importent que matplotlib et charts.py, jamais le script de la page (les workers
+  "spawn" de multiprocessing ré-exécutent __main__, qui est la page sous Streamlit).
+  Les graphiques sont désignés par leur nom dans charts.py (charts.<nom>_figure) et
+  leurs arguments, transmis aux processus par pickle.
+"""
+
+import io
+import os
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CHART_IMAGE_FORMAT = os.getenv("CHART_IMAGE_FORMAT", "png")
+CHART_DPI = int(os.getenv("CHART_DPI", "200"))  # résolution par défaut de st.pyplot
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "0"))  # >= 2 pour le rendu parallèle
+CHART_RENDER_TIMEOUT = float(os.getenv("CHART_RENDER_TIMEOUT", "30"))  # au-delà : rendu en série
+
+
+def render_figure(fig, image_format=CHART_IMAGE_FORMAT, dpi=CHART_DPI):
+    """
+    Rastérise une Figure comme st.pyplot.
+
+    Returns:
+    bytes | str: Octets PNG, ou document SVG (texte, tel qu'attendu par st.image)
+    """
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=image_format, dpi=dpi, bbox_inches="tight")
+    image = buffer.getvalue()
+    return image.decode("utf-8") if image_format == "svg" else image
+
+
+def _render_chart(chart, args, image_format, dpi):
+    """Construit charts.<chart>_figure(*args) et la rastérise (exécuté dans un worker ou en série)."""
+    import charts
+
+    return render_figure(getattr(charts, f"{chart}_figure")(*args), image_format, dpi)
+
+
+def _init_worker():
+    # Imports payés une fois par processus, pas à chaque graphique
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import charts  # noqa: F401
+
+
+def _worker_main():
+    """Point d'entrée d'un worker : tâches (fonction, arguments) picklées sur stdin, résultats sur stdout."""
+    results = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)  # les print() des graphiques vont sur stderr : stdout est réservé aux résultats
+    _init_worker()
+    tasks = sys.stdin.buffer
+    while True:
+        try:
+            fn, args = pickle.load(tasks)
+        except EOFError:
+            return  # pool arrêté
+        try:
+            result = (True, fn(*args))
+        except Exception as e:
+            result = (False, e)
+        try:
+            payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            payload = pickle.dumps((False, RuntimeError(f"Résultat non transmissible : {e!r}")))
+        results.write(payload)
+        results.flush()
+
+
+class ChartWorkerPool:
+    """
+    Pool de processus de rendu, même interface que concurrent.futures (submit -> Future,
+    shutdown) ; BrokenProcessPool si un worker meurt, comme ProcessPoolExecutor.
+
+    Parameters:
+    workers (int): Nombre de processus, tous démarrés immédiatement
+    """
+
+    def __init__(self, workers):
+        self._jobs = queue.SimpleQueue()  # (Future, fonction, arguments), None = arrêt
+        self._lock = threading.Lock()
+        self._broken = None
+        self._shutdown = False
+        self._processes = []
+        self._threads = []
+        for i in range(workers):
+            process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker"],
+                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            thread = threading.Thread(target=self._serve, args=(process,), name=f"chart-worker-{i}", daemon=True)
+            self._processes.append(process)
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._broken is not None:
+                raise BrokenProcessPool(self._broken)
+            if self._shutdown:
+                raise RuntimeError("Pool de rendu arrêté")
+            future = Future()
+            self._jobs.put((future, fn, args))
+        return future
+
+    def _serve(self, process):
+        # Un thread par worker : envoie une tâche, attend son résultat, passe à la suivante
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                payload = pickle.dumps((fn, args), protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            try:
+                process.stdin.write(payload)
+                process.stdin.flush()
+                ok, value = pickle.load(process.stdout)
+            except (OSError, EOFError, pickle.UnpicklingError) as e:
+                self._break(f"worker de rendu {process.pid} interrompu ({e!r})", future)
+                break
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        try:
+            process.stdin.close()  # fin de stdin : le worker s'arrête après sa tâche en cours
+        except OSError:
+            pass
+        process.wait()
+
+    def _break(self, reason, future):
+        with self._lock:
+            self._broken = reason
+        future.set_exception(BrokenProcessPool(reason))
+        # Tâches en attente : aucune ne sera exécutée
+        stops = 0
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                stops += 1
+            elif job[0].set_running_or_notify_cancel():
+                job[0].set_exception(BrokenProcessPool(reason))
+        for _ in range(stops):
+            self._jobs.put(None)  # arrêts déjà demandés : rendus aux autres threads
+        self.shutdown(wait=False)
+
+    def shutdown(self, wait=True, kill=False):
+        """
+        Arrête les workers une fois les tâches déjà soumises terminées.
+
+        Parameters:
+        wait (bool): Attendre l'arrêt des threads de service
+        kill (bool): Tuer les workers sans attendre leur tâche en cours (BrokenProcessPool pour les tâches restantes)
+        """
+        with self._lock:
+            if not self._shutdown:
+                self._shutdown = True
+                for _ in self._threads:
+                    self._jobs.put(None)
+        if kill:
+            for process in self._processes:
+                process.kill()
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+
+def render_charts(jobs, image_format=CHART_IMAGE_FORMAT, dpi=CHART_DPI, executor=None,
+                  timeout=CHART_RENDER_TIMEOUT):
+    """
+    Rend plusieurs graphiques indépendants, en parallèle si un pool est fourni.
+
+    Parameters:
+    jobs (list): [(nom du graphique, tuple d'arguments)] (ex: ("wind", (df_h,)))
+    image_format (str): "png" ou "svg"
+    dpi (int): Résolution du rendu
+    executor (ChartWorkerPool): Pool de rendu (None = en série dans le thread courant)
+    timeout (float): Délai maximal du rendu parallèle (secondes), puis rendu en série
+
+    Returns:
+    list: Images dans l'ordre de `jobs` (ordre d'affichage)
+    """
+    if executor is None or len(jobs) < 2:
+        return [_render_chart(chart, args, image_format, dpi) for chart, args in jobs]
+    futures = []
+    try:
+        futures = [executor.submit(_render_chart, chart, args, image_format, dpi) for chart, args in jobs]
+        limit = time.monotonic() + timeout
+        return [future.result(max(0.0, limit - time.monotonic())) for future in futures]
+    except BrokenProcessPool as e:
+        # Worker tué (mémoire, signal) : le pool est inutilisable, on le recrée au prochain appel
+        print(f"⚠️ Pool de rendu des graphiques interrompu ({e}), rendu en série")
+        _discard_chart_executor(executor)
+    except TimeoutError:
+        # Worker bloqué : tué avec son pool, recréé au prochain appel
+        print(f"⚠️ Rendu parallèle des graphiques au-delà de {timeout} s, rendu en série")
+        _discard_chart_executor(executor, kill=True)
+    # Images déjà rendues par le pool gardées, les autres rendues ici
+    images = []
+    for (chart, args), future in zip(jobs, futures or [None] * len(jobs)):
+        if future is not None and future.done() and not future.cancelled() and future.exception() is None:
+            images.append(future.result())
+        else:
+            images.append(_render_chart(chart, args, image_format, dpi))
+    return images
+
+
+class ChartCache:
+    """
+    Images de graphiques en LRU, thread-safe.
+
+    Parameters:
+    max_bytes (int): Taille maximale des images gardées en mémoire
+    """
+
+    def __init__(self, max_bytes=CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()  # clé -> image, ordre LRU
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "render_ms": 0.0}
+
+    def render_many(self, version, jobs, image_format=CHART_IMAGE_FORMAT, dpi=CHART_DPI, executor=None):
+        """
+        Images de plusieurs graphiques d'une même version ; celles absentes du cache
+        sont rendues ensemble par render_charts (en parallèle dans le pool de rendu).
+
+        Parameters:
+        version (str): Empreinte des données affichées (ex: PreparedView.digest)
+        jobs (list): [(nom du graphique, tuple d'arguments)] dans l'ordre d'affichage
+        image_format (str): "png" ou "svg"
+        dpi (int): Résolution du rendu
+        executor (ChartWorkerPool): Pool de rendu (défaut : get_chart_executor() dès 2 images à rendre)
+
+        Returns:
+        list: Images à passer à st.image, dans l'ordre de `jobs`
+        """
+        keys = [(chart, version, image_format, dpi) for chart, _ in jobs]
+        images = [None] * len(jobs)
+        with self._lock:
+            for i, key in enumerate(keys):
+                image = self._images.get(key)
+                if image is not None:
+                    self._images.move_to_end(key)
+                    self.counters["hits"] += 1
+                    images[i] = image
+        missing = [i for i, image in enumerate(images) if image is None]
+        if not missing:
+            return images
+
+        # Rendu hors verrou ; en cas de course, la première image enregistrée est gardée
+        started = time.perf_counter()
+        if executor is None and len(missing) > 1:
+            executor = get_chart_executor()
+        rendered = render_charts([jobs[i] for i in missing], image_format, dpi, executor)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.counters["misses"] += len(missing)
+            self.counters["render_ms"] += elapsed_ms
+            for i, image in zip(missing, rendered):
+                images[i] = self._store(keys[i], image)
+        return images
+
+    def _store(self, key, image):
+        if key in self._images:
+            return self._images[key]
+        self._images[key] = image
+        self._bytes += len(image)
+        while self._bytes > self.max_bytes and len(self._images) > 1:
+            _, evicted = self._images.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.counters["evictions"] += 1
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._images)
+            stats["bytes"] = self._bytes
+        stats["render_ms"] = round(stats["render_ms"], 1)
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+_chart_cache = None
+_chart_cache_lock = threading.Lock()
+
+
+def get_chart_cache():
+    """Cache d'images partagé par toutes les sessions du processus."""
+    global _chart_cache
+    with _chart_cache_lock:
+        if _chart_cache is None:
+            _chart_cache = ChartCache()
+        return _chart_cache
+
+
+def configure_chart_cache(max_bytes=CHART_CACHE_MAX_BYTES):
+    """Remplace le cache d'images (ex: autre plafond mémoire)."""
+    global _chart_cache
+    with _chart_cache_lock:
+        _chart_cache = ChartCache(max_bytes)
+        return _chart_cache
+
+
+_chart_executor = None
+_chart_executor_lock = threading.Lock()
+
+
+def create_chart_executor(workers=CHART_RENDER_WORKERS):
+    """Pool de rendu de `workers` processus (cf. ChartWorkerPool), tous démarrés immédiatement."""
+    return ChartWorkerPool(workers)
+
+
+def get_chart_executor():
+    """Pool de rendu partagé par les sessions, démarré au premier besoin (None si CHART_RENDER_WORKERS <= 1, le défaut)."""
+    global _chart_executor
+    with _chart_executor_lock:
+        if _chart_executor is None and CHART_RENDER_WORKERS > 1:
+            _chart_executor = create_chart_executor(CHART_RENDER_WORKERS)
+        return _chart_executor
+
+
+def configure_chart_executor(workers=CHART_RENDER_WORKERS):
+    """Remplace le pool de rendu (workers <= 1 : rendu en série) ; l'ancien s'arrête après ses rendus en cours."""
+    global _chart_executor, CHART_RENDER_WORKERS
+    with _chart_executor_lock:
+        previous, _chart_executor = _chart_executor, None
+        CHART_RENDER_WORKERS = workers
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return get_chart_executor()
+
+
+def _discard_chart_executor(executor, kill=False):
+    global _chart_executor
+    with _chart_executor_lock:
+        if _chart_executor is executor:
+            _chart_executor = None
+    executor.shutdown(wait=False, kill=kill)
+
+
+if __name__ == "__main__" and sys.argv[1:] == ["--worker"]:
+    _worker_main()
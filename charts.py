@@ -0,0 +1,281 @@
+"""
+Construction des graphiques de la page de données (Altair et matplotlib).
+
+Chaque fonction reçoit un DataFrame de la vue préparée (weather_views.py) et renvoie le
+graphique (alt.Chart ou matplotlib.figure.Figure) sans l'afficher : la page
+le passe à st.altair_chart ou au cache d'images (chart_cache.py), et benchmarks.py
+peut mesurer chaque construction isolément. Les figures matplotlib sont créées avec
+l'API objet (Figure), sans l'état global de pyplot : plusieurs sessions peuvent les
+construire en parallèle.
+"""
+
+import altair as alt
+import numpy as np
+import pandas as pd
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+
+
+# ---------- Altair ----------
+def line_chart(df: pd.DataFrame, x_col: str, y_col: str, y_title: str):
+    return (
+        alt.Chart(df)
+        .mark_line(point=True)
+        .encode(
+            x=alt.X(x_col, title="Heure"),
+            y=alt.Y(y_col, title=y_title),
+            tooltip=[x_col, y_col],
+        )
+        .properties(height=240)
+        .interactive()
+    )
+
+def line_chart_temp_duo(df: pd.DataFrame, x_col: str, temp_col: str, felt_col: str):
+    df = df.copy()
+    df["idx"] = range(len(df))
+    long_df = df.melt(id_vars=[x_col, "idx"], value_vars=[temp_col, felt_col],
+                      var_name="Série", value_name="Valeur")
+    color_scale = alt.Scale(domain=[temp_col, felt_col], range=["#E4572E", "#2E6BE4"])
+    base = (
+        alt.Chart(long_df)
+        .mark_line(point=True)
+        .encode(
+            x=alt.X(x_col, title="Heure"),
+            y=alt.Y("Valeur:Q", title="°C"),
+            color=alt.Color("Série:N", scale=color_scale, legend=None),
+            tooltip=[x_col, "Série", "Valeur"]
+        ).properties(height=240).interactive()
+    )
+    labels = (
+        alt.Chart(long_df)
+        .transform_joinaggregate(max_idx="max(idx)", groupby=["Série"])
+        .transform_filter("datum.idx == datum.max_idx")
+        .mark_text(align="left", dx=6, dy=-6, fontSize=12)
+        .encode(x=alt.X(x_col), y=alt.Y("Valeur:Q"), text=alt.Text("Série"),
+                color=alt.Color("Série:N", scale=color_scale, legend=None))
+    )
+    return base + labels
+
+def chart_7days(df: pd.DataFrame):
+    # Base commune
+    base = alt.Chart(df).encode(x=alt.X("Jour:N", sort=None, title=None))
+
+    # Barre pour la pluie
+    bar = base.mark_bar(opacity=0.3, color="#4A90E2").encode(
+        y=alt.Y("Pluie (mm):Q", title="Précipitations (mm)"),
+        tooltip=["Jour", "Pluie (mm)", "Proba (%)"]
+    )
+
+    # Lignes pour Temp Max et Min
+    line_max = base.mark_line(color="#E4572E", point=True).encode(
+        y=alt.Y("Max (°C):Q", title="Température (°C)"),
+        tooltip=["Jour", "Max (°C)"]
+    )
+    line_min = base.mark_line(color="#2E6BE4", point=True).encode(
+        y=alt.Y("Min (°C):Q"),
+        tooltip=["Jour", "Min (°C)"]
+    )
+
+    # On combine le tout
+    return alt.layer(bar, line_max + line_min).resolve_scale(y='independent').properties(height=350)
+
+
+# ---------- matplotlib ----------
+def temperature_humidity_figure(df_h):
+    """Onglet Statistiques : température et humidité sur deux axes (colonnes Heure, temperature_2m, relative_humidity_2m)."""
+    fig = Figure(figsize=(10, 4))
+    ax1 = fig.subplots()
+
+    ax1.set_xlabel('Heure')
+    ax1.set_ylabel('Température (°C)', color='tab:red')
+    ax1.plot(df_h["Heure"], pd.to_numeric(df_h["temperature_2m"], errors="coerce"),
+            color='tab:red', marker='o', label='Température')
+    ax1.tick_params(axis='y', labelcolor='tab:red')
+    ax1.grid(alpha=0.3)
+
+    ax2 = ax1.twinx()
+    ax2.set_ylabel('Humidité (%)', color='tab:blue')
+    ax2.plot(df_h["Heure"], pd.to_numeric(df_h["relative_humidity_2m"], errors="coerce"),
+            color='tab:blue', marker='s', label='Humidité')
+    ax2.tick_params(axis='y', labelcolor='tab:blue')
+
+    ax2.set_title('Corrélation Température-Humidité')
+    ax1.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+def wind_rose_figure(directions, speeds):
+    """Onglet Vent : rose des vents (directions en degrés, vitesses en km/h)."""
+    fig = Figure(figsize=(8, 8))
+    ax = fig.subplots(subplot_kw=dict(projection='polar'))
+
+    # Convertir en radians
+    theta = np.radians(directions)
+
+    # Tracer les vecteurs
+    colors = colormaps['viridis'](speeds / speeds.max())
+    ax.scatter(theta, speeds, c=colors, s=50, alpha=0.6)
+
+    ax.set_theta_zero_location('N')
+    ax.set_theta_direction(-1)
+    ax.set_title('Rose des vents - Direction et vitesse', pad=20)
+    ax.set_ylabel('Vitesse (km/h)')
+    return fig
+
+def wind_figure(df_h):
+    """Onglet Vent : vitesse du vent et rafales (colonnes Heure, wind_speed_10m, wind_gusts_10m)."""
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+
+    ax.plot(df_h["Heure"], pd.to_numeric(df_h["wind_speed_10m"], errors="coerce"),
+           label='Vent', marker='o', color='steelblue')
+    ax.plot(df_h["Heure"], pd.to_numeric(df_h["wind_gusts_10m"], errors="coerce"),
+           label='Rafales', marker='s', color='orange', alpha=0.7)
+
+    ax.axhline(y=40, color='r', linestyle='--', alpha=0.5, label='Seuil vent fort (40 km/h)')
+
+    ax.set_xlabel('Heure')
+    ax.set_ylabel('Vitesse (km/h)')
+    ax.set_title('Évolution du vent')
+    ax.legend()
+    ax.grid(alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+def precipitation_timeline_figure(df_h):
+    """Onglet Précipitations : probabilité de pluie heure par heure (colonnes Heure, Proba)."""
+    fig = Figure(figsize=(12, 3))
+    ax = fig.subplots()
+
+    # Barres horizontales avec gradient de couleur
+    colors = colormaps['Blues'](df_h["Proba"] / 100)
+    ax.barh(0, 1, left=range(len(df_h)), height=0.8, color=colors, edgecolor='none')
+
+    # Seuil 50%
+    rain_hours = df_h[df_h["Proba"] >= 50]
+    if len(rain_hours) > 0:
+        for idx in rain_hours.index:
+            ax.axvline(x=idx, color='red', alpha=0.3, linestyle='--')
+
+    ax.set_xlim(-0.5, len(df_h)-0.5)
+    ax.set_xticks(range(len(df_h)))
+    ax.set_xticklabels(df_h["Heure"], rotation=45, ha='right')
+    ax.set_yticks([])
+    ax.set_xlabel('Heure')
+    ax.set_title('Probabilité de pluie (Bleu foncé = haute probabilité)')
+    ax.grid(axis='x', alpha=0.3)
+
+    fig.tight_layout()
+    return fig
+
+def humidity_figure(df_h):
+    """Onglet Précipitations : humidité relative (colonnes Heure, Humidité)."""
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+    ax.fill_between(range(len(df_h)), df_h["Humidité"], alpha=0.3, color='cyan')
+    ax.plot(df_h["Humidité"], marker='o', color='darkblue')
+    ax.axhline(y=70, color='orange', linestyle='--', alpha=0.5, label='Seuil humide (70%)')
+    ax.set_xlabel('Heure')
+    ax.set_ylabel('Humidité (%)')
+    ax.set_title('Évolution de l\'humidité')
+    ax.set_xticks(range(len(df_h)))
+    ax.set_xticklabels(df_h["Heure"], rotation=45)
+    ax.legend()
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+def daylight_figure(df_d):
+    """Onglet Ensoleillement : durée du jour sur la semaine (colonnes Jour, daylight_duration)."""
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+
+    durations_hours = pd.to_numeric(df_d["daylight_duration"], errors="coerce") / 3600
+    ax.plot(df_d["Jour"], durations_hours, marker='o', color='gold', linewidth=2)
+    ax.fill_between(range(len(df_d)), durations_hours, alpha=0.3, color='yellow')
+    ax.set_xlabel('Jour')
+    ax.set_ylabel('Durée (heures)')
+    ax.set_title('Durée d\'ensoleillement théorique')
+    ax.grid(alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+def uv_figure(df_h):
+    """Onglet Ensoleillement : indice UV coloré par niveau de risque (colonnes Heure, UV)."""
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+
+    colors = []
+    for uv in df_h["UV"]:
+        if pd.isna(uv): colors.append('gray')
+        elif uv < 3: colors.append('green')
+        elif uv < 6: colors.append('yellow')
+        elif uv < 8: colors.append('orange')
+        elif uv < 11: colors.append('red')
+        else: colors.append('purple')
+
+    ax.bar(range(len(df_h)), df_h["UV"], color=colors, alpha=0.7)
+    ax.set_xlabel('Heure')
+    ax.set_ylabel('Indice UV')
+    ax.set_title('Indice UV sur 24h (Vert=Faible, Jaune=Modéré, Orange=Élevé, Rouge=Très élevé)')
+    ax.set_xticks(range(len(df_h)))
+    ax.set_xticklabels(df_h["Heure"], rotation=45)
+    ax.grid(axis='y', alpha=0.3)
+
+    # Légende
+    legend_elements = [
+        Patch(facecolor='green', label='Faible (0-3)'),
+        Patch(facecolor='yellow', label='Modéré (3-6)'),
+        Patch(facecolor='orange', label='Élevé (6-8)'),
+        Patch(facecolor='red', label='Très élevé (8-11)'),
+        Patch(facecolor='purple', label='Extrême (11+)')
+    ]
+    ax.legend(handles=legend_elements, loc='upper left', fontsize=8)
+
+    fig.tight_layout()
+    return fig
+
+def comfort_figure(df_h):
+    """Onglet Confort : température réelle vs ressentie avec zone de confort (colonnes Heure, Temp, Ressenti)."""
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+
+    ax.plot(df_h["Heure"], df_h["Temp"], label='Température réelle',
+           marker='o', color='steelblue', linewidth=2)
+    ax.plot(df_h["Heure"], df_h["Ressenti"], label='Température ressentie',
+           marker='s', color='coral', linewidth=2, linestyle='--')
+
+    # Zone de confort
+    ax.axhspan(18, 24, alpha=0.2, color='green', label='Zone de confort')
+
+    ax.set_xlabel('Heure')
+    ax.set_ylabel('Température (°C)')
+    ax.set_title('Température réelle vs. ressentie avec zone de confort')
+    ax.legend(loc='best')
+    ax.grid(alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+def temperature_heatmap_figure(pivot):
+    """Onglet Jour vs Nuit : heatmap jours x heures (pivot_table Temp, index Jour, colonnes Heure)."""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    im = ax.imshow(pivot, cmap='RdYlBu_r', aspect='auto')
+
+    ax.set_xticks(range(24))
+    ax.set_xticklabels([f"{h}h" for h in range(24)])
+    ax.set_yticks(range(len(pivot.index)))
+    ax.set_yticklabels(pivot.index)
+    ax.set_xlabel('Heure')
+    ax.set_ylabel('Jour')
+    ax.set_title('Heatmap des températures (Rouge=Chaud, Bleu=Froid)')
+
+    cbar = fig.colorbar(im, ax=ax)
+    cbar.set_label('Température (°C)', rotation=270, labelpad=20)
+
+    fig.tight_layout()
+    return fig
@@ -1,8 +1,9 @@
 import os
 from typing import Optional, List, Dict, Any
-import requests
 from datetime import datetime
 
+import numpy as np
+
 from dotenv import load_dotenv
 
 # LangChain / LangGraph
@@ -23,47 +24,88 @@ from requete_page1 import (
     get_saints_data,
     get_horoscope_data,
     get_blague_data,
+    horoscope_configured,
+    jokes_configured,
+    get_httpx_client,
+    AGENT_FIELDS,
 )
+from resilience import deadline
+from gazetteer import geocode_city
 
 
 load_dotenv()
 
+# Échéance (secondes) d'un tour de l'agent : bornes des appels LLM et des outils qu'il déclenche
+AGENT_DEADLINE = float(os.getenv("AGENT_DEADLINE", "90"))
+
 
 def _get_city_coords(city_name: str) -> Optional[tuple[float, float]]:
     """
-    Utilise l'API de géocodage Photon pour obtenir les coordonnées d'une ville.
-    Photon est plus fiable que Nominatim pour les déploiements cloud.
+    Coordonnées d'une ville via l'index local (gazetteer.py), Photon en dernier recours.
     Retourne (latitude, longitude) ou None si échec.
     """
     try:
-        url = "https://photon.komoot.io/api/"
-        params = {
-            "q": city_name,
-            "limit": 1,
-            "lang": "fr"
-        }
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("features") and len(data["features"]) > 0:
-            coordinates = data["features"][0]["geometry"]["coordinates"]
-            # Photon renvoie [longitude, latitude], on inverse
-            lon, lat = coordinates[0], coordinates[1]
-            return lat, lon
+        return geocode_city(city_name)
     except Exception as e:
         print(f"Erreur géocodage pour '{city_name}': {e}")
     return None
 
 
+_PERIOD_BOUNDS = {
+    "nuit": (0, 6),
+    "matin": (6, 12),
+    "apres_midi": (12, 18),
+    "soir": (18, 24),
+}
+
+
+def _period_stats(temps, precip_prob, wind) -> Dict[str, Any]:
+    return {
+        "temperature_avg": round(sum(temps) / len(temps), 1) if temps else None,
+        "temperature_min": round(min(temps), 1) if temps else None,
+        "temperature_max": round(max(temps), 1) if temps else None,
+        "precipitation_probability_avg": round(sum(precip_prob) / len(precip_prob), 1) if precip_prob else None,
+        "wind_speed_avg": round(sum(wind) / len(wind), 1) if wind else None,
+    }
+
+
+def _aggregate_frame_by_period(frame, date_str: str) -> Dict[str, Any]:
+    """Version colonnaire de _aggregate_hourly_by_period (masques NumPy, aucun dict par ligne)."""
+    # Jours et heures UTC en entiers (secondes depuis l'epoch) : aucun formatage de date par ligne
+    seconds = frame.time_index.as_unit("s").asi8
+    on_day = seconds // 86_400 == np.datetime64(date_str, "D").astype(np.int64)
+    hours = seconds // 3_600 % 24
+
+    def _values(name, mask):
+        col = frame.column(name)
+        if col is None:
+            return []
+        vals = np.asarray(col[mask], dtype=float)
+        return vals[~np.isnan(vals)].tolist()
+
+    result = {}
+    for period_name, (h_start, h_end) in _PERIOD_BOUNDS.items():
+        mask = on_day & (hours >= h_start) & (hours < h_end)
+        if not mask.any():
+            continue
+        result[period_name] = _period_stats(
+            _values("temperature_2m", mask),
+            _values("precipitation_probability", mask),
+            _values("wind_speed_10m", mask),
+        )
+    return result
+
+
 def _aggregate_hourly_by_period(hourly_data: List[Dict], date_str: str) -> Dict[str, Any]:
     """
     Agrège les données horaires par période de la journée (nuit, matin, après-midi, soir).
     Retourne les moyennes et min/max pour chaque période.
+    Accepte un WeatherFrame (chemin colonnaire) ou l'ancienne liste de dictionnaires.
     """
-    from datetime import datetime
-    
+    frame = getattr(hourly_data, "frame", hourly_data)
+    if hasattr(frame, "time_index"):
+        return _aggregate_frame_by_period(frame, date_str)
+
     periods = {
         "nuit": [],      # 0h-6h
         "matin": [],     # 6h-12h
@@ -101,13 +143,7 @@ def _aggregate_hourly_by_period(hourly_data: List[Dict], date_str: str) -> Dict[
         precip_prob = [r.get("precipitation_probability") for r in period_data if r.get("precipitation_probability") is not None]
         wind = [r.get("wind_speed_10m") for r in period_data if r.get("wind_speed_10m") is not None]
         
-        result[period_name] = {
-            "temperature_avg": round(sum(temps) / len(temps), 1) if temps else None,
-            "temperature_min": round(min(temps), 1) if temps else None,
-            "temperature_max": round(max(temps), 1) if temps else None,
-            "precipitation_probability_avg": round(sum(precip_prob) / len(precip_prob), 1) if precip_prob else None,
-            "wind_speed_avg": round(sum(wind) / len(wind), 1) if wind else None,
-        }
+        result[period_name] = _period_stats(temps, precip_prob, wind)
     
     return result
 
@@ -151,7 +187,7 @@ def tool_get_weather(city: str, days: str = "today") -> Dict[str, Any]:
         return {"ok": False, "message": f"Impossible de trouver les coordonnées de '{city}'"}
     
     lat, lon = coords
-    data = get_weather_data(lat, lon)
+    data = get_weather_data(lat, lon, columnar=True, fields=AGENT_FIELDS)
     if not data:
         return {"ok": False, "message": "Données météo indisponibles"}
 
@@ -255,6 +291,8 @@ def tool_get_horoscope(sign: str) -> Dict[str, Any]:
     """
     Récupère l'horoscope du jour pour un signe donné et renvoie la version française si disponible.
     """
+    if not horoscope_configured():
+        return {"ok": False, "message": "Horoscope non configuré"}
     data = get_horoscope_data(sign)
     if not data:
         return {"ok": False, "message": "Horoscope indisponible"}
@@ -271,6 +309,8 @@ def tool_get_blague() -> Dict[str, Any]:
     """
     Récupère une blague courte (question/réponse) et la renvoie.
     """
+    if not jokes_configured():
+        return {"ok": False, "message": "Blagues non configurées"}
     data = get_blague_data()
     if not data:
         return {"ok": False, "message": "Blague indisponible"}
@@ -317,6 +357,7 @@ def build_agent():
         max_tokens=None,
         timeout=60,
         groq_api_key=api_key,
+        http_client=get_httpx_client("groq"),
     )
 
     tools = [tool_get_weather, tool_get_saints, tool_get_horoscope, tool_get_blague, tool_search_web]
@@ -370,7 +411,8 @@ def run_agent(user_input: str, history: Optional[List[Dict[str, str]]] = None) -
     """Invoke the agent with optional history and return assistant text."""
     graph = build_agent()
     messages = _to_lc_messages(history or []) + [HumanMessage(content=user_input)]
-    result = graph.invoke({"messages": messages})
+    with deadline(AGENT_DEADLINE):
+        result = graph.invoke({"messages": messages})
     # result["messages"] est une liste de BaseMessage ; on récupère le dernier AIMessage
     out_msgs = result.get("messages", [])
     last_ai = next((m for m in reversed(out_msgs) if isinstance(m, AIMessage)), None)
@@ -0,0 +1,356 @@
+"""
+Cache à deux niveaux pour les données déjà parsées (prévisions, saints, horoscopes).
+
+- L1 : LRU en mémoire du processus, borné en octets, qui garde les objets Python
+  prêts à l'emploi (WeatherFrame, dictionnaires) : un hit ne reparse rien.
+- L2 : stockage persistant (SQLite en mode WAL ou répertoire de fichiers)
+  qui survit aux redémarrages ; un hit L2 remonte l'entrée en L1.
+
+Chaque jeu de données a sa propre durée de vie (CACHE_TTLS), modifiable par
+variable d'environnement (ex: CACHE_TTL_HOURLY=1800) ou via configure_ttl().
+Une fenêtre de grâce (CACHE_GRACES, ex: CACHE_GRACE_HOURLY=600) garde les entrées
+expirées disponibles pour lookup() : elles sont servies comme « périmées »
+pendant que l'appelant les rafraîchit (stale-while-revalidate).
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+def seconds_until_midnight():
+    """Durée de vie d'une donnée valable pour le jour calendaire local en cours."""
+    now = datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(1, int((midnight - now).total_seconds()))
+
+
+# Durées de vie par jeu de données (secondes, ou fonction renvoyant des secondes)
+CACHE_TTLS = {
+    "current": 600,
+    "hourly": 3600,
+    "daily": 3 * 3600,
+    "saints": seconds_until_midnight,
+    "horoscope": seconds_until_midnight,
+    "translations": 30 * 86400,  # empreinte du texte -> traduction
+    "alias": 7 * 86400,  # coordonnées quantifiées -> maille du modèle
+    "geocode": 30 * 86400,  # nom de ville normalisé -> coordonnées Photon
+}
+for _dataset in list(CACHE_TTLS):
+    _env = os.getenv(f"CACHE_TTL_{_dataset.upper()}")
+    if _env:
+        CACHE_TTLS[_dataset] = int(_env)
+
+# Fenêtre de grâce après expiration (secondes) pendant laquelle une entrée peut
+# encore être servie en attendant son rafraîchissement ; 0 = pas de grâce
+CACHE_GRACES = {
+    "current": 1800,
+    "hourly": 3600,
+    "daily": 3 * 3600,
+}
+for _dataset in list(CACHE_GRACES):
+    _env = os.getenv(f"CACHE_GRACE_{_dataset.upper()}")
+    if _env:
+        CACHE_GRACES[_dataset] = int(_env)
+
+CACHE_BACKEND = os.getenv("FORECAST_CACHE_BACKEND", "sqlite")  # sqlite | filesystem | none
+CACHE_PATH = os.getenv("FORECAST_CACHE_PATH", ".forecast_cache")
+CACHE_L1_MAX_BYTES = int(os.getenv("FORECAST_CACHE_L1_BYTES", str(64 * 1024 * 1024)))
+
+
+class LRUCache:
+    """LRU thread-safe borné par la taille (en octets) des valeurs stockées."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, value, expires_at, size):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, expires_at, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteStore:
+    """Stockage L2 dans une table SQLite (journal WAL, accès sérialisé par un verrou)."""
+
+    def __init__(self, path):
+        self.path = path if path.endswith(".sqlite") else f"{path}.sqlite"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key, blob, expires_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, blob, expires_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FileSystemStore:
+    """Stockage L2 dans un répertoire : un fichier pickle par clé."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl")
+
+    def get(self, key):
+        try:
+            with open(self._file(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return None
+
+    def set(self, key, blob, expires_at):
+        tmp = self._file(key) + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((blob, expires_at), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._file(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.path):
+            if name.endswith(".pkl"):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+    def close(self):
+        pass
+
+
+class TieredCache:
+    """
+    Cache L1 (mémoire, LRU en octets) devant un stockage L2 persistant optionnel.
+    Les valeurs sont des objets Python déjà parsés ; seule la copie L2 est sérialisée.
+    """
+
+    def __init__(self, l1_max_bytes=CACHE_L1_MAX_BYTES, store=None, ttls=None, graces=None):
+        self.l1 = LRUCache(l1_max_bytes)
+        self.l2 = store
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self.graces = dict(CACHE_GRACES if graces is None else graces)
+        self._stats_lock = threading.Lock()
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "stale_hits": 0, "misses": 0, "sets": 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def ttl(self, dataset):
+        ttl = self.ttls.get(dataset, 3600)
+        return ttl() if callable(ttl) else ttl
+
+    def configure_ttl(self, dataset, ttl):
+        """ttl : secondes ou fonction sans argument renvoyant des secondes."""
+        self.ttls[dataset] = ttl
+
+    def grace(self, dataset):
+        return self.graces.get(dataset, 0)
+
+    def configure_grace(self, dataset, grace):
+        """grace : secondes pendant lesquelles une entrée expirée reste servable par lookup()."""
+        self.graces[dataset] = grace
+
+    @staticmethod
+    def _full_key(dataset, key):
+        return f"{dataset}|{key}"
+
+    def get(self, dataset, key):
+        """Renvoie la valeur en cache si elle n'a pas expiré, sinon None."""
+        return self.lookup(dataset, key, allow_stale=False)[0]
+
+    def lookup(self, dataset, key, allow_stale=True):
+        """
+        Renvoie (valeur, périmée). Une entrée expirée mais encore dans sa fenêtre
+        de grâce est renvoyée avec périmée=True ; au-delà, (None, False).
+        """
+        full_key = self._full_key(dataset, key)
+        now = time.time()
+        grace = self.grace(dataset)
+
+        entry = self.l1.get(full_key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > now:
+                self._count("l1_hits")
+                return value, False
+            if expires_at + grace <= now:
+                self.l1.delete(full_key)
+            elif allow_stale:
+                self._count("stale_hits")
+                return value, True
+
+        if self.l2 is not None:
+            try:
+                stored = self.l2.get(full_key)
+            except Exception as e:
+                print(f"⚠️ Cache L2 indisponible : {e}")
+                stored = None
+            if stored is not None:
+                blob, expires_at = stored
+                if expires_at + grace > now:
+                    stale = expires_at <= now
+                    if stale and not allow_stale:
+                        self._count("misses")
+                        return None, False
+                    try:
+                        value = pickle.loads(blob)
+                    except Exception:
+                        value = None
+                    if value is not None:
+                        self.l1.set(full_key, value, expires_at, len(blob))
+                        self._count("stale_hits" if stale else "l2_hits")
+                        return value, stale
+                try:
+                    self.l2.delete(full_key)
+                except Exception as e:
+                    print(f"⚠️ Suppression cache L2 impossible : {e}")
+
+        self._count("misses")
+        return None, False
+
+    def set(self, dataset, key, value, ttl=None):
+        full_key = self._full_key(dataset, key)
+        expires_at = time.time() + (self.ttl(dataset) if ttl is None else ttl)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.l1.set(full_key, value, expires_at, len(blob))
+        if self.l2 is not None:
+            try:
+                self.l2.set(full_key, blob, expires_at)
+            except Exception as e:
+                print(f"⚠️ Écriture cache L2 impossible : {e}")
+        self._count("sets")
+
+    def delete(self, dataset, key):
+        full_key = self._full_key(dataset, key)
+        self.l1.delete(full_key)
+        if self.l2 is not None:
+            self.l2.delete(full_key)
+
+    def clear(self):
+        self.l1.clear()
+        if self.l2 is not None:
+            self.l2.clear()
+
+    def stats(self):
+        """Compteurs hits / misses / évictions et occupation de L1."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["evictions"] = self.l1.evictions
+        stats["l1_entries"] = len(self.l1)
+        stats["l1_bytes"] = self.l1.current_bytes
+        return stats
+
+
+def _build_store(backend, path):
+    if backend == "sqlite":
+        return SQLiteStore(path)
+    if backend == "filesystem":
+        return FileSystemStore(path)
+    return None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_forecast_cache():
+    """Cache partagé du processus (créé à la première utilisation)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                store = _build_store(CACHE_BACKEND, CACHE_PATH)
+            except Exception as e:
+                print(f"⚠️ Cache persistant désactivé : {e}")
+                store = None
+            _cache = TieredCache(store=store)
+        return _cache
+
+
+def configure_forecast_cache(backend=CACHE_BACKEND, path=CACHE_PATH, l1_max_bytes=CACHE_L1_MAX_BYTES, ttls=None, graces=None):
+    """Remplace le cache partagé (backend "sqlite", "filesystem" ou "none")."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None and _cache.l2 is not None:
+            _cache.l2.close()
+        _cache = TieredCache(l1_max_bytes=l1_max_bytes, store=_build_store(backend, path), ttls=ttls, graces=graces)
+        return _cache
@@ -0,0 +1,253 @@
+"""
+Prévisions partagées entre les sessions Streamlit du processus.
+
+Au lieu d'une copie de la prévision par session (st.session_state.weather_data),
+chaque session garde un bail (ForecastLease) vers une entrée commune, identifiée
+par (lieu, version de la prévision) : cent sessions sur la même ville partagent
+une seule prévision en mémoire et un seul chargement par nouvelle version.
+
+- Entrées immuables : dictionnaires en lecture seule (MappingProxyType), WeatherFrame
+  partagés tels quels ; une nouvelle version crée une nouvelle entrée.
+- Comptage de références : un bail compte pour une référence jusqu'à release() ou
+  jusqu'à la destruction de la session (le bail est alors ramassé par le GC).
+- Éviction LRU des entrées sans référence dès que le total dépasse
+  SHARED_FORECAST_MAX_BYTES ; une version remplacée sans référence est retirée
+  immédiatement. Les entrées en cours d'utilisation ne sont jamais retirées.
+- Données dérivées (ex: vue préparée des onglets, cf. weather_views.py) : calculées
+  une fois par entrée via ForecastLease.derived() et comptées dans sa taille.
+"""
+
+import os
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+from types import MappingProxyType
+
+SHARED_FORECAST_MAX_BYTES = int(os.getenv("SHARED_FORECAST_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def _freeze(forecast):
+    """Vue en lecture seule d'une prévision au format get_weather_data(columnar=True)."""
+    frozen = dict(forecast)
+    if isinstance(frozen.get("current"), dict):
+        frozen["current"] = MappingProxyType(dict(frozen["current"]))
+    return MappingProxyType(frozen)
+
+
+def _forecast_nbytes(forecast):
+    """Taille d'une prévision : tableaux des WeatherFrame + données actuelles sérialisées."""
+    size = 0
+    for value in forecast.values():
+        nbytes = getattr(value, "nbytes", None)
+        if callable(nbytes):
+            nbytes = nbytes()
+        if isinstance(nbytes, int):
+            size += nbytes
+        else:
+            size += len(pickle.dumps(dict(value) if isinstance(value, MappingProxyType) else value,
+                                     protocol=pickle.HIGHEST_PROTOCOL))
+    return size
+
+
+class _Entry:
+    __slots__ = ("place", "data", "nbytes", "refs", "keys", "derived")
+
+    def __init__(self, place, data, nbytes):
+        self.place = place
+        self.data = data
+        self.nbytes = nbytes
+        self.refs = 0
+        self.keys = set()  # (lieu, version) par lesquelles acquire() la retrouve
+        self.derived = {}  # nom -> donnée dérivée de `data`
+
+    def same_forecast(self, data):
+        """
+        Même prévision en cache (mêmes WeatherFrame, mêmes données actuelles), quelle que
+        soit la version lue ; un rafraîchissement de "current" seul donne une nouvelle entrée.
+        """
+        if not all(self.data.get(name) is data.get(name) for name in ("hourly", "daily")):
+            return False
+        return dict(self.data.get("current") or {}) == dict(data.get("current") or {})
+
+
+class ForecastLease:
+    """
+    Référence d'une session vers une prévision partagée ; `data` est la prévision
+    (lecture seule). Libérée par release() ou automatiquement à sa destruction.
+    """
+
+    __slots__ = ("key", "generation", "_cache", "_entry", "_finalizer", "__weakref__")
+
+    def __init__(self, cache, entry, generation):
+        self.key, self.generation = entry.place, generation
+        self._cache = cache
+        self._entry = entry
+        self._finalizer = weakref.finalize(self, cache._release, entry)
+
+    @property
+    def data(self):
+        return self._entry.data
+
+    def derived(self, name, builder):
+        """
+        Donnée dérivée de la prévision, builder(data), calculée une seule fois
+        par version et partagée par toutes les sessions qui tiennent un bail dessus.
+        """
+        return self._cache._derived(self._entry, name, builder)
+
+    def release(self):
+        self._finalizer()
+
+    def __repr__(self):
+        return f"ForecastLease({self.key!r}, version {self.generation})"
+
+
+class SharedForecastCache:
+    """
+    Registre des prévisions partagées, thread-safe.
+
+    Parameters:
+    max_bytes (int): Plafond mémoire des entrées (celles encore référencées peuvent le dépasser)
+    """
+
+    def __init__(self, max_bytes=SHARED_FORECAST_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (lieu, version) -> _Entry, ordre LRU
+        self._live = {}  # id -> _Entry, entrées accessibles ou encore référencées
+        # Réentrant : un bail ramassé par le GC peut être libéré pendant que le verrou est tenu
+        self._lock = threading.RLock()
+        self.counters = {"hits": 0, "loads": 0, "deduplicated": 0, "evictions": 0, "derived": 0}
+
+    def acquire(self, key, generation, loader, refresh=False):
+        """
+        Bail sur la prévision (key, generation), chargée par loader() si personne
+        ne l'a encore (ou toujours si refresh=True, ex: actualisation manuelle).
+
+        Parameters:
+        key (str): Identifiant du lieu (ex: clé de grille des coordonnées)
+        generation (int): Version de la prévision lue avant le chargement
+        loader (callable): Renvoie la prévision au format get_weather_data(columnar=True)
+        refresh (bool): Recharger même si la version est déjà partagée
+
+        Returns:
+        ForecastLease: Bail à garder dans la session (lease.data pour lire la prévision)
+        """
+        entry_key = (key, generation)
+        if not refresh:
+            with self._lock:
+                entry = self._entries.get(entry_key)
+                if entry is not None:
+                    self._entries.move_to_end(entry_key)
+                    self.counters["hits"] += 1
+                    entry.refs += 1
+                    return ForecastLease(self, entry, generation)
+
+        # Chargement hors verrou : les appels simultanés sont déjà regroupés par get_weather_data
+        data = loader()
+        with self._lock:
+            self.counters["loads"] += 1
+            # La version lue avant l'appel peut être plus ancienne que la prévision obtenue :
+            # une session qui a chargé la même prévision sous une autre version la partage.
+            # Copie de _live : un bail ramassé par le GC pendant le parcours le modifie (_release)
+            entry = next((e for e in list(self._live.values()) if e.place == key and e.same_forecast(data)), None)
+            if entry is None:
+                frozen = _freeze(data)
+                entry = _Entry(key, frozen, _forecast_nbytes(frozen))
+                self._live[id(entry)] = entry
+            else:
+                self.counters["deduplicated"] += 1
+            entry.refs += 1
+            self._attach(entry_key, entry)
+            self._evict()
+        return ForecastLease(self, entry, generation)
+
+    def _derived(self, entry, name, builder):
+        with self._lock:
+            if name in entry.derived:
+                return entry.derived[name]
+        # Calcul hors verrou ; en cas de course, la première valeur enregistrée est gardée
+        value = builder(entry.data)
+        with self._lock:
+            if name not in entry.derived:
+                entry.derived[name] = value
+                entry.nbytes += _forecast_nbytes({name: value})
+                self.counters["derived"] += 1
+                self._evict()
+            return entry.derived[name]
+
+    def _attach(self, entry_key, entry):
+        key, generation = entry_key
+        # Les versions plus anciennes du même lieu ne seront plus demandées
+        for old_key in [k for k in list(self._entries) if k[0] == key and k[1] <= generation]:
+            self._detach(old_key)
+        self._entries[entry_key] = entry
+        entry.keys.add(entry_key)
+
+    def _detach(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:  # déjà retirée par une libération imbriquée
+            return
+        entry.keys.discard(entry_key)
+        self._forget(entry)
+
+    def _forget(self, entry):
+        if entry.refs == 0 and not entry.keys:
+            self._live.pop(id(entry), None)
+
+    def _release(self, entry):
+        with self._lock:
+            entry.refs -= 1
+            self._forget(entry)
+            self._evict()
+
+    def _evict(self):
+        total = sum(entry.nbytes for entry in list(self._live.values()))
+        for entry_key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            entry = self._entries.get(entry_key)
+            if entry is None or entry.refs > 0:
+                continue
+            self._detach(entry_key)
+            if id(entry) not in self._live:
+                total -= entry.nbytes
+                self.counters["evictions"] += 1
+
+    def stats(self):
+        """
+        Entrées, octets en mémoire et octets économisés par rapport à une copie
+        de la prévision par session (bytes_saved).
+        """
+        with self._lock:
+            live = list(self._live.values())
+            stats = dict(self.counters)
+            stats["entries"] = len(live)
+            stats["leases"] = sum(entry.refs for entry in live)
+        stats["bytes"] = sum(entry.nbytes for entry in live)
+        stats["pinned_bytes"] = sum(entry.nbytes for entry in live if entry.refs > 0)
+        stats["per_session_bytes"] = sum(entry.nbytes * entry.refs for entry in live)
+        stats["bytes_saved"] = stats["per_session_bytes"] - stats["pinned_bytes"]
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_forecasts():
+    """Registre des prévisions partagé par toutes les sessions du processus."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedForecastCache()
+        return _shared
+
+
+def configure_shared_forecasts(max_bytes=SHARED_FORECAST_MAX_BYTES):
+    """Remplace le registre (les baux existants restent valides sur l'ancien)."""
+    global _shared
+    with _shared_lock:
+        _shared = SharedForecastCache(max_bytes)
+        return _shared
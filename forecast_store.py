@@ -0,0 +1,264 @@
+"""
+Historique local des prévisions : chaque prévision récupérée est ajoutée (jamais
+réécrite) à un jeu de fichiers Parquet partitionné.
+
+Arborescence (partitionnement « hive ») :
+    <FORECAST_STORE_PATH>/resolution=hourly/location=48.85_2.35/run_date=2025-11-09/<run>-<uuid>-0.parquet
+
+Chaque ligne porte l'heure de récupération (`run_time`, l'API ne renvoyant pas
+l'heure de run du modèle), l'échéance (`valid_time`) et une colonne float32 par
+variable du registre WEATHER_VARIABLES (null si la variable n'a pas été demandée).
+Le schéma est fixe : des fichiers écrits avec des jeux de variables différents
+se lisent ensemble, et query() profite du filtrage par partition, des
+statistiques de row groups (valid_time) et de la lecture des seules colonnes utiles.
+"""
+
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+FORECAST_STORE_PATH = os.getenv("FORECAST_STORE_PATH", ".forecast_store")
+FORECAST_STORE_ENABLED = os.getenv("FORECAST_STORE_ENABLED", "1") != "0"
+
+
+def location_partition(location_key):
+    """Clé de cache "lat|lon" (coordonnées quantifiées) -> valeur de partition "lat_lon"."""
+    return location_key.replace("|", "_")
+
+
+class ForecastStore:
+    """
+    Stockage append-only des prévisions en Parquet (pyarrow).
+
+    Parameters:
+    path (str): Répertoire racine du jeu de données
+    variables (dict): Registre {"current"|"hourly"|"daily": [noms]} (cf. WEATHER_VARIABLES)
+    epoch_variables (iterable): Variables contenant des timestamps epoch (sunrise, sunset)
+    """
+
+    def __init__(self, path, variables, epoch_variables=()):
+        import pyarrow as pa
+
+        self.path = path
+        self.variables = {resolution: tuple(names) for resolution, names in variables.items()}
+        self.epoch_variables = frozenset(epoch_variables)
+        self._lock = threading.Lock()
+        self._schemas = {}
+        for resolution, names in self.variables.items():
+            fields = [
+                pa.field("run_time", pa.timestamp("s", tz="UTC")),
+                pa.field("valid_time", pa.timestamp("s", tz="UTC")),
+            ]
+            for name in names:
+                dtype = pa.timestamp("s", tz="UTC") if name in self.epoch_variables else pa.float32()
+                fields.append(pa.field(name, dtype))
+            self._schemas[resolution] = pa.schema(fields)
+        os.makedirs(self.path, exist_ok=True)
+
+    # --- Écriture ---
+    def append(self, location_key, forecast, run_time=None):
+        """
+        Ajoute une prévision parsée ({"current": dict, "hourly"/"daily": WeatherFrame}).
+        Chaque appel écrit de nouveaux fichiers ; rien n'est modifié ni supprimé.
+        """
+        run_time = run_time or datetime.now(timezone.utc)
+        run_epoch = int(run_time.timestamp())
+        tables = {
+            "current": self._current_table(forecast.get("current") or {}, run_epoch),
+            "hourly": self._frame_table("hourly", forecast.get("hourly"), run_epoch),
+            "daily": self._frame_table("daily", forecast.get("daily"), run_epoch),
+        }
+        partition = {
+            "location": location_partition(location_key),
+            "run_date": run_time.strftime("%Y-%m-%d"),
+        }
+        written = 0
+        with self._lock:
+            for resolution, table in tables.items():
+                if table is None or table.num_rows == 0:
+                    continue
+                directory = os.path.join(
+                    self.path,
+                    f"resolution={resolution}",
+                    f"location={partition['location']}",
+                    f"run_date={partition['run_date']}",
+                )
+                self._write(table, directory, f"{run_epoch}-{uuid.uuid4().hex}-0.parquet")
+                written += table.num_rows
+        return written
+
+    @staticmethod
+    def _write(table, directory, filename):
+        import pyarrow.parquet as pq
+
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, filename)
+        tmp = os.path.join(directory, f".{filename}.tmp")  # préfixe "." : ignoré par les lectures
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, target)
+
+    def _frame_table(self, resolution, frame, run_epoch):
+        import pyarrow as pa
+
+        if frame is None or len(frame) == 0 or not frame.columns:
+            return None
+        n = len(frame)
+        valid = np.arange(frame.start, frame.start + n * frame.interval, frame.interval, dtype="int64")[:n]
+        arrays = []
+        for field in self._schemas[resolution]:
+            if field.name == "run_time":
+                arrays.append(pa.array(np.full(n, run_epoch, dtype="int64"), type=pa.int64()).cast(field.type))
+            elif field.name == "valid_time":
+                arrays.append(pa.array(valid, type=pa.int64()).cast(field.type))
+            else:
+                values = frame.column(field.name)
+                if values is None:
+                    arrays.append(pa.nulls(n, type=field.type))
+                elif field.name in self.epoch_variables:
+                    arrays.append(pa.array(np.asarray(values, dtype="int64"), type=pa.int64()).cast(field.type))
+                else:
+                    arrays.append(pa.array(np.asarray(values, dtype="float32"), type=field.type))
+        return pa.Table.from_arrays(arrays, schema=self._schemas[resolution])
+
+    def _current_table(self, current, run_epoch):
+        import pyarrow as pa
+
+        timestamp = current.get("timestamp")
+        if timestamp is None:
+            return None
+        arrays = []
+        for field in self._schemas["current"]:
+            if field.name == "run_time":
+                value = run_epoch
+            elif field.name == "valid_time":
+                value = int(timestamp)
+            else:
+                value = current.get(field.name)
+            if pa.types.is_timestamp(field.type):
+                arrays.append(pa.array([value], type=pa.int64()).cast(field.type))
+            else:
+                arrays.append(pa.array([value], type=field.type))
+        return pa.Table.from_arrays(arrays, schema=self._schemas["current"])
+
+    # --- Lecture ---
+    def _dataset(self, resolution):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        base = os.path.join(self.path, f"resolution={resolution}")
+        if not os.path.isdir(base):
+            return None
+        partitioning = ds.partitioning(
+            pa.schema([pa.field("location", pa.string()), pa.field("run_date", pa.string())]),
+            flavor="hive",
+        )
+        return ds.dataset(
+            base,
+            schema=self._schemas[resolution].append(pa.field("location", pa.string())).append(pa.field("run_date", pa.string())),
+            format="parquet",
+            partitioning=partitioning,
+            ignore_prefixes=[".", "_"],
+        )
+
+    def query(self, location_key, resolution="hourly", variables=None, start=None, end=None,
+              run_start=None, run_end=None, latest=False):
+        """
+        Lit une fenêtre de l'historique d'un lieu.
+
+        Parameters:
+        location_key (str): Clé "lat|lon" quantifiée (cf. requete_page1._location_key)
+        resolution (str): "current", "hourly" ou "daily"
+        variables (list): Variables à lire (None = toutes) ; seules ces colonnes sont lues
+        start, end (datetime): Fenêtre d'échéances [start, end) (UTC si naïves)
+        run_start, run_end (datetime): Fenêtre des heures de récupération [run_start, run_end)
+        latest (bool): Ne garder, pour chaque échéance, que la prévision la plus récente
+
+        Returns:
+        pandas.DataFrame: Colonnes run_time, valid_time + variables, triées par échéance puis récupération
+        """
+        import pandas as pd
+        import pyarrow.dataset as ds
+
+        if resolution not in self._schemas:
+            raise ValueError(f"Résolution inconnue : {resolution}")
+        names = list(self.variables[resolution] if variables is None else variables)
+        unknown = set(names) - set(self.variables[resolution])
+        if unknown:
+            raise ValueError(f"Variables {resolution} inconnues : {sorted(unknown)}")
+
+        columns = ["run_time", "valid_time"] + names
+        dataset = self._dataset(resolution)
+        if dataset is None:
+            return pd.DataFrame(columns=columns)
+
+        # Filtre poussé jusqu'aux fichiers : partitions (lieu, jour de récupération) puis row groups
+        condition = ds.field("location") == location_partition(location_key)
+        if run_start is not None:
+            condition &= ds.field("run_date") >= _utc(run_start).strftime("%Y-%m-%d")
+            condition &= ds.field("run_time") >= _utc(run_start)
+        if run_end is not None:
+            condition &= ds.field("run_date") <= _utc(run_end).strftime("%Y-%m-%d")
+            condition &= ds.field("run_time") < _utc(run_end)
+        if start is not None:
+            condition &= ds.field("valid_time") >= _utc(start)
+        if end is not None:
+            condition &= ds.field("valid_time") < _utc(end)
+
+        df = dataset.to_table(columns=columns, filter=condition).to_pandas()
+        df = df.sort_values(["valid_time", "run_time"], kind="stable").reset_index(drop=True)
+        if latest:
+            df = df.drop_duplicates("valid_time", keep="last").reset_index(drop=True)
+        return df
+
+    def runs(self, location_key, resolution="hourly"):
+        """Heures de récupération disponibles pour un lieu (ordre chronologique)."""
+        import pandas as pd
+        import pyarrow.dataset as ds
+
+        dataset = self._dataset(resolution)
+        if dataset is None:
+            return []
+        table = dataset.to_table(
+            columns=["run_time"],
+            filter=ds.field("location") == location_partition(location_key),
+        )
+        return sorted(pd.unique(table.column("run_time").to_pandas()))
+
+
+def _utc(value):
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+_store = None
+_store_disabled = not FORECAST_STORE_ENABLED
+_store_lock = threading.Lock()
+
+
+def get_forecast_store(variables, epoch_variables=()):
+    """
+    Historique partagé du processus (créé à la première utilisation), ou None si
+    désactivé (FORECAST_STORE_ENABLED=0) ou si pyarrow n'est pas installé.
+    """
+    global _store, _store_disabled
+    with _store_lock:
+        if _store is None and not _store_disabled:
+            try:
+                _store = ForecastStore(FORECAST_STORE_PATH, variables, epoch_variables)
+            except ImportError as e:
+                print(f"⚠️ Historique des prévisions désactivé (pyarrow manquant) : {e}")
+                _store_disabled = True
+        return _store
+
+
+def configure_forecast_store(path=FORECAST_STORE_PATH, enabled=True):
+    """Change le répertoire de l'historique (ou le désactive) ; recréé au prochain accès."""
+    global _store, _store_disabled, FORECAST_STORE_PATH
+    with _store_lock:
+        FORECAST_STORE_PATH = path
+        _store_disabled = not enabled
+        _store = None
@@ -0,0 +1,453 @@
+"""
+Géocodage des villes : index local d'abord, Photon seulement en dernier recours.
+
+Le fichier des villes (GAZETTEER_PATH, par défaut data/cities.tsv livré avec
+l'application) est chargé une fois par processus et indexé par nom normalisé
+(sans accents ni casse, tirets et apostrophes ramenés à des espaces, « St » =
+« Saint ») : une recherche exacte est une simple lecture de dictionnaire. Les
+noms alternatifs (Londres, München...) pointent vers la même ville ; en cas
+d'homonymes, la ville du pays par défaut (GAZETTEER_DEFAULT_COUNTRY, FR) l'emporte,
+puis la plus peuplée : « Saint-Denis » est celle de Seine-Saint-Denis, pas celle de
+La Réunion. Toutes les villes d'un nom ambigu restent disponibles (homonyms) pour
+que l'accueil les propose.
+
+Formats acceptés :
+- TSV avec en-tête : name, alternatenames, latitude, longitude, country_code, population
+- export GeoNames brut (ex: cities15000.txt, 19 colonnes sans en-tête), à
+  télécharger sur https://download.geonames.org/export/dump/ puis
+  GAZETTEER_PATH=chemin/vers/cities15000.txt
+
+Une ville absente de l'index est demandée à Photon ; la réponse (ou l'absence de
+réponse) est gardée dans le cache persistant (jeu "geocode") et dans l'index ;
+l'index de suggestions est alors reconstruit à la demande suivante.
+
+Pour la saisie (suggest_cities), un second index construit à la première
+suggestion associe chaque trigramme de nom aux noms qui le contiennent : une
+faute de frappe (« Marseile ») garde la plupart des trigrammes de la bonne
+ville. Les noms commençant par la saisie sont toujours proposés, et le
+classement favorise les villes peuplées.
+"""
+
+import math
+import os
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from itertools import chain
+
+import numpy as np
+
+from forecast_cache import get_forecast_cache
+from requete_page1 import get_http_session, PHOTON_URL
+
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cities.tsv"),
+)
+# Pays préféré entre homonymes (code ISO, celui des codes pays du fichier des villes)
+GAZETTEER_DEFAULT_COUNTRY = os.getenv("GAZETTEER_DEFAULT_COUNTRY", "FR")
+# Durée (secondes) pendant laquelle un nom inconnu de Photon n'est pas redemandé
+GEOCODE_NEGATIVE_TTL = int(os.getenv("GEOCODE_NEGATIVE_TTL", "86400"))
+
+# Suggestions : nombre proposé, saisie minimale, similarité minimale (coefficient
+# de Dice sur les trigrammes) et poids de la population dans le classement
+SUGGEST_LIMIT = int(os.getenv("SUGGEST_LIMIT", "8"))
+SUGGEST_MIN_CHARS = int(os.getenv("SUGGEST_MIN_CHARS", "2"))
+SUGGEST_MIN_SIMILARITY = float(os.getenv("SUGGEST_MIN_SIMILARITY", "0.45"))
+SUGGEST_POPULATION_WEIGHT = float(os.getenv("SUGGEST_POPULATION_WEIGHT", "0.3"))
+
+# Abréviations développées à la normalisation
+_ABBREVIATIONS = {"st": "saint", "ste": "sainte"}
+_SEPARATORS = str.maketrans({"-": " ", "'": " ", "’": " ", ".": " ", ",": " "})
+
+
+def normalize_name(name):
+    """
+    Forme canonique d'un nom de ville pour l'index.
+
+    Parameters:
+    name (str): Nom saisi (ex: "  St-Étienne ")
+
+    Returns:
+    str: Nom normalisé (ex: "saint etienne")
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(c for c in decomposed if not unicodedata.combining(c))
+    tokens = ascii_name.casefold().translate(_SEPARATORS).split()
+    return " ".join(_ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+def _preference(entry):
+    """Clé de choix entre homonymes : pays par défaut d'abord, puis population."""
+    return entry["country"] == GAZETTEER_DEFAULT_COUNTRY, entry["population"]
+
+
+def _same_city(a, b):
+    """Même ville listée deux fois (lignes en double du fichier des villes)."""
+    return (a["country"] == b["country"] and round(a["lat"], 2) == round(b["lat"], 2)
+            and round(a["lon"], 2) == round(b["lon"], 2))
+
+
+def _read_rows(path):
+    """Lit le fichier des villes : (nom, noms alternatifs, lat, lon, pays, population)."""
+    with open(path, encoding="utf-8") as f:
+        first = f.readline().rstrip("\n").split("\t")
+        if first[:1] == ["name"]:
+            columns = {name: i for i, name in enumerate(first)}
+            fields = (columns["name"], columns["alternatenames"], columns["latitude"],
+                      columns["longitude"], columns["country_code"], columns["population"])
+            lines = f
+        else:
+            fields = (1, 3, 4, 5, 8, 14)  # colonnes GeoNames, pas d'en-tête : la 1re ligne est une ville
+            lines = chain(["\t".join(first)], f)
+        for line in lines:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) <= max(fields):
+                continue
+            name, alternates, lat, lon, country, population = (parts[i] for i in fields)
+            try:
+                yield (name, alternates.split(",") if alternates else [], float(lat), float(lon),
+                       country, int(population or 0))
+            except ValueError:
+                continue
+
+
+def _trigram_codes(names):
+    """
+    Trigrammes de chaque nom (bornés par des espaces : "  nom "), codés en entiers
+    à partir des points de code Unicode et calculés pour tous les noms à la fois.
+
+    Returns:
+    tuple: (lignes, codes) dédoublonnés, triés par code puis par ligne
+    """
+    padded = [f"  {name} " for name in names]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    chars = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    codes = (chars[:-2] << 42) | (chars[1:-1] << 21) | chars[2:]
+    rows = np.repeat(np.arange(len(padded), dtype=np.int32), lengths)[:-2]
+    # Les deux derniers trigrammes de chaque nom débordent sur le nom suivant
+    valid = np.ones(len(codes), dtype=bool)
+    ends = np.cumsum(lengths)
+    for shift in (1, 2):
+        crossing = ends - shift
+        valid[crossing[crossing < len(codes)]] = False
+    rows, codes = rows[valid], codes[valid]
+    order = np.lexsort((rows, codes))
+    rows, codes = rows[order], codes[order]
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    return rows[first], codes[first]
+
+
+class SuggestIndex:
+    """
+    Index de suggestions sur les noms de l'index exact.
+
+    - préfixe : noms triés, plage trouvée par dichotomie ;
+    - trigrammes : lignes des noms regroupées par code de trigramme (tableaux
+      NumPy), retrouvées par dichotomie et comptées en une fois pour une saisie.
+
+    Parameters:
+    index (dict): {nom normalisé: ville} (cf. Gazetteer)
+    """
+
+    def __init__(self, index):
+        started = time.perf_counter()
+        self.names = sorted(index)
+        self.entries = [index[name] for name in self.names]
+        city_ids = {}
+        self._cities = np.array([city_ids.setdefault(id(entry), len(city_ids)) for entry in self.entries], dtype=np.int32)
+
+        # Listes par trigramme : lignes triées par code de trigramme, bornes de chaque code
+        rows, codes = _trigram_codes(self.names)
+        self._rows = rows
+        self._codes, self._starts = np.unique(codes, return_index=True)
+        self._stops = np.append(self._starts[1:], len(rows))
+        self._sizes = np.bincount(rows, minlength=len(self.names)).astype(np.int16)
+
+        population = np.array([entry["population"] for entry in self.entries], dtype=np.float64)
+        top = math.log10(population.max() + 10) if len(population) else 1.0
+        self._weights = SUGGEST_POPULATION_WEIGHT * np.log10(population + 10) / top
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    def _prefix_rows(self, query):
+        start = bisect_left(self.names, query)
+        stop = bisect_left(self.names, query + "\uffff")
+        return np.arange(start, stop, dtype=np.int32)
+
+    def _trigram_rows(self, query):
+        _, grams = _trigram_codes([query])
+        found = np.searchsorted(self._codes, grams).clip(max=max(len(self._codes) - 1, 0))
+        found = found[self._codes[found] == grams] if len(self._codes) else found[:0]
+        postings = [self._rows[self._starts[i]:self._stops[i]] for i in found]
+        if not postings:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        hits = np.concatenate(postings)
+        if len(hits) * 8 > len(self.names):
+            # Beaucoup de correspondances : comptage direct sur tous les noms
+            shared = np.bincount(hits, minlength=len(self.names))
+            rows = np.flatnonzero(shared).astype(np.int32)
+            shared = shared[rows]
+        else:
+            rows, shared = np.unique(hits, return_counts=True)
+        similarity = 2 * shared / (len(grams) + self._sizes[rows])
+        keep = similarity >= SUGGEST_MIN_SIMILARITY
+        return rows[keep], similarity[keep]
+
+    def suggest(self, query, limit=SUGGEST_LIMIT):
+        """
+        Villes proposées pour une saisie, de la plus pertinente à la moins pertinente.
+
+        Parameters:
+        query (str): Saisie en cours (même partielle ou mal orthographiée)
+        limit (int): Nombre maximal de villes
+
+        Returns:
+        list: Dicts {name, country, lat, lon, population, matched, score} ; `matched`
+              est le nom (éventuellement alternatif, normalisé) qui a fait la correspondance
+        """
+        query = normalize_name(query)
+        if len(query) < SUGGEST_MIN_CHARS:
+            return []
+
+        prefix_rows = self._prefix_rows(query)
+        fuzzy_rows, similarity = self._trigram_rows(query)
+        rows = np.concatenate([prefix_rows, fuzzy_rows])
+        if not len(rows):
+            return []
+        # Un nom qui commence par la saisie compte comme une correspondance parfaite
+        scores = np.concatenate([np.ones(len(prefix_rows)), similarity]) + self._weights[rows]
+
+        suggestions = []
+        seen = set()
+        for position in np.argsort(-scores, kind="stable"):
+            row = rows[position]
+            city = self._cities[row]
+            if city in seen:
+                continue
+            seen.add(city)
+            entry = self.entries[row]
+            suggestions.append({**entry, "matched": self.names[row], "score": round(float(scores[position]), 3)})
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+    def nbytes(self):
+        """Taille approximative des tableaux de l'index (octets, hors chaînes et dictionnaires)."""
+        return (self._rows.nbytes + self._codes.nbytes + self._starts.nbytes + self._stops.nbytes + self._sizes.nbytes + self._weights.nbytes + self._cities.nbytes)
+
+
+class Gazetteer:
+    """
+    Index des villes en mémoire (chargé à la première recherche).
+
+    Parameters:
+    path (str): Fichier des villes (cf. formats acceptés plus haut)
+    """
+
+    def __init__(self, path=GAZETTEER_PATH):
+        self.path = path
+        self.entries = []
+        self._index = None
+        self._homonyms = {}  # nom normalisé -> villes de ce nom, la préférée d'abord (noms ambigus seulement)
+        self._suggest = None
+        self._lock = threading.Lock()
+        self.counters = {"local_hits": 0, "cache_hits": 0, "photon_calls": 0, "not_found": 0, "suggestions": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _load(self):
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            index = {}
+            homonyms = {}
+            try:
+                for name, alternates, lat, lon, country, population in _read_rows(self.path):
+                    entry = {"name": name, "lat": lat, "lon": lon, "country": country, "population": population}
+                    self.entries.append(entry)
+                    for key in {normalize_name(n) for n in [name, *alternates]}:
+                        if not key:
+                            continue
+                        current = index.get(key)
+                        if current is None:
+                            index[key] = entry
+                            continue
+                        if _same_city(current, entry):
+                            continue
+                        cities = homonyms.setdefault(key, [current])
+                        if not any(_same_city(city, entry) for city in cities):
+                            cities.append(entry)
+                        if _preference(current) < _preference(entry):
+                            index[key] = entry
+                for cities in homonyms.values():
+                    cities.sort(key=_preference, reverse=True)
+                print(f"🗺️ Index des villes chargé : {len(self.entries)} villes, {len(index)} noms")
+            except OSError as e:
+                print(f"⚠️ Fichier des villes illisible ({self.path}) : {e}")
+            self._index = index
+            self._homonyms = homonyms
+            return index
+
+    def lookup(self, name):
+        """Ville de l'index local pour ce nom (dict name/lat/lon/country/population) ou None, sans réseau."""
+        return self._load().get(normalize_name(name))
+
+    def homonyms(self, name):
+        """
+        Toutes les villes de l'index local portant ce nom, sans réseau.
+
+        Returns:
+        list: Villes (dicts comme lookup), celle renvoyée par lookup d'abord ;
+              [] si le nom est inconnu, une seule ville s'il n'est pas ambigu
+        """
+        key = normalize_name(name)
+        index = self._load()
+        with self._lock:
+            cities = self._homonyms.get(key)
+            if cities:
+                return list(cities)
+            entry = index.get(key)
+        return [] if entry is None else [entry]
+
+    def suggest_index(self):
+        """Index de suggestions (construit à la première demande)."""
+        index = self._load()
+        with self._lock:
+            if self._suggest is None:
+                self._suggest = SuggestIndex(index)
+                print(f"🔤 Index de suggestions construit en {self._suggest.build_ms:.0f} ms "
+                      f"({len(self._suggest._codes)} trigrammes)")
+            return self._suggest
+
+    def suggest(self, query, limit=SUGGEST_LIMIT):
+        """Villes proposées pour une saisie partielle ou approximative (cf. SuggestIndex.suggest)."""
+        self._count("suggestions")
+        return self.suggest_index().suggest(query, limit)
+
+    def remember(self, name, entry):
+        """Ajoute à l'index une ville trouvée ailleurs (Photon) sous le nom recherché."""
+        index = self._load()
+        key = normalize_name(name)
+        with self._lock:
+            if key in index:
+                return
+            index[key] = entry
+            self._suggest = None  # reconstruit à la prochaine suggestion, avec cette ville
+
+    def geocode(self, name):
+        """
+        Coordonnées d'une ville : index local, puis cache persistant, puis Photon.
+
+        Parameters:
+        name (str): Nom de la ville
+
+        Returns:
+        tuple: (latitude, longitude) ou None si la ville est introuvable
+        Les erreurs réseau de Photon (requests.exceptions.RequestException) sont propagées.
+        """
+        key = normalize_name(name)
+        if not key:
+            return None
+
+        entry = self.lookup(name)
+        if entry is not None:
+            self._count("local_hits")
+            return entry["lat"], entry["lon"]
+
+        cache = get_forecast_cache()
+        cached = cache.get("geocode", key)
+        if cached is not None:
+            self._count("cache_hits")
+            if not cached:
+                return None
+            self.remember(name, cached)
+            return cached["lat"], cached["lon"]
+
+        self._count("photon_calls")
+        entry = _photon_lookup(name)
+        if entry is None:
+            self._count("not_found")
+            cache.set("geocode", key, {}, ttl=GEOCODE_NEGATIVE_TTL)
+            return None
+        cache.set("geocode", key, entry)
+        self.remember(name, entry)
+        return entry["lat"], entry["lon"]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["cities"] = len(self.entries)
+            stats["names"] = len(self._index or ())
+            if self._suggest is not None:
+                stats["suggest_build_ms"] = round(self._suggest.build_ms, 1)
+                stats["suggest_kib"] = round(self._suggest.nbytes() / 1024, 1)
+        return stats
+
+
+def _photon_lookup(name):
+    """Première ville renvoyée par Photon (dict comme les entrées de l'index) ou None."""
+    params = {
+        "q": name,
+        "limit": 1,
+        "lang": "fr"
+    }
+    response = get_http_session("photon").get(PHOTON_URL, params=params)
+    response.raise_for_status()
+
+    features = response.json().get("features") or []
+    if not features:
+        return None
+    # Photon renvoie [longitude, latitude]
+    lon, lat = features[0]["geometry"]["coordinates"][:2]
+    properties = features[0].get("properties", {})
+    return {
+        "name": properties.get("name", name),
+        "lat": lat,
+        "lon": lon,
+        "country": properties.get("countrycode", ""),
+        "population": 0,
+    }
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """Index des villes partagé par le processus."""
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            _gazetteer = Gazetteer()
+        return _gazetteer
+
+
+def geocode_city(name):
+    """
+    Coordonnées (latitude, longitude) d'une ville, ou None si elle est introuvable.
+    Sans appel réseau pour les villes de l'index local ou déjà cherchées.
+    """
+    return get_gazetteer().geocode(name)
+
+
+def suggest_cities(query, limit=SUGGEST_LIMIT):
+    """
+    Suggestions de villes pour la saisie en cours, sans appel réseau.
+
+    Parameters:
+    query (str): Saisie (ex: "Marseile", "st eti", "londr")
+    limit (int): Nombre maximal de suggestions
+
+    Returns:
+    list: Dicts {name, country, lat, lon, population, matched, score}, les meilleurs d'abord
+    """
+    return get_gazetteer().suggest(query, limit)
+
+
+def get_gazetteer_stats():
+    """Compteurs de géocodage (index local, cache, appels Photon)."""
+    return get_gazetteer().stats()
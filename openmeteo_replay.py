@@ -0,0 +1,523 @@
+"""
+Enregistrement et rejeu hors ligne des réponses Open-Meteo (FlatBuffers bruts).
+
+- record_fixtures() interroge l'API réelle pour une liste de lieux et enregistre
+  chaque réponse brute dans un répertoire de fixtures (+ manifest.json).
+- synthesize_fixtures() produit des fixtures déterministes sans réseau (valeurs
+  pseudo-aléatoires reproductibles, même structure que l'API).
+- ReplayAdapter rejoue ces fixtures au niveau transport (adaptateur requests) ;
+  install_replay() le branche sur la session Open-Meteo de requete_page1.
+- ReplayServer les sert depuis un serveur HTTP local, pour un processus séparé :
+      python openmeteo_replay.py serve fixtures/ --port 8766
+      OPENMETEO_URL=http://127.0.0.1:8766/v1/forecast streamlit run Accueil.py
+
+Une fixture est identifiée par son lieu (coordonnées demandées arrondies à 4 décimales,
+sinon le lieu enregistré le plus proche) et par la liste des variables demandées.
+Les fenêtres forecast_hours / past_hours / forecast_days sont appliquées au rejeu
+comme par l'API (séries hourly / daily tronquées, "current" inchangé) ; les autres
+paramètres sont ignorés. Une requête multi-lieux renvoie les fixtures concaténées.
+Chaque réponse peut être retardée (`latency`) pour simuler le réseau.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+from requests.adapters import BaseAdapter
+
+import requete_page1 as rp
+
+MANIFEST = "manifest.json"
+
+# Lieux enregistrés par défaut : les villes prédéfinies de la page d'accueil (Accueil.VILLES_PREDEFINIES)
+DEFAULT_LOCATIONS = [
+    (48.8566, 2.3522), (51.5074, -0.1278), (40.7128, -74.0060), (35.6762, 139.6503),
+    (52.5200, 13.4050), (40.4168, -3.7038), (41.9028, 12.4964), (-33.8688, 151.2093),
+]
+VARIABLE_SECTIONS = ("current", "hourly", "daily")
+
+
+def _split(values):
+    """Valeurs de paramètre (liste, "a,b" ou répétées) -> liste plate de chaînes."""
+    if values is None:
+        return []
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    return [part for value in values for part in str(value).split(",") if part]
+
+
+def variables_key(params):
+    """Empreinte courte des variables demandées (sections current / hourly / daily)."""
+    payload = {section: _split(params.get(section)) for section in VARIABLE_SECTIONS}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:10]
+
+
+def _fixture_name(latitude, longitude, key):
+    return f"{latitude:.4f}_{longitude:.4f}_{key}.fb"
+
+
+class FixtureSet:
+    """
+    Index des fixtures d'un répertoire.
+
+    Parameters:
+    directory (str): Répertoire contenant manifest.json et les fichiers .fb
+    nearest (bool): Si aucun enregistrement n'existe pour un lieu, rejouer celui du
+                    lieu enregistré le plus proche (mêmes variables) plutôt qu'échouer
+    """
+
+    def __init__(self, directory, nearest=True):
+        self.directory = directory
+        self.nearest = nearest
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self._payloads = {}
+        self._by_key = {}
+        for entry in self.manifest["fixtures"]:
+            with open(os.path.join(directory, entry["file"]), "rb") as f:
+                payload = f.read()
+            location = (round(entry["latitude"], 4), round(entry["longitude"], 4))
+            self._payloads[(location, entry["variables"])] = payload
+            self._by_key.setdefault(entry["variables"], []).append(location)
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def payload(self, params):
+        """Corps de réponse (messages FlatBuffers concaténés) pour des paramètres de requête."""
+        key = variables_key(params)
+        latitudes, longitudes = _split(params.get("latitude")), _split(params.get("longitude"))
+        if len(latitudes) != len(longitudes) or not latitudes:
+            raise KeyError("latitude / longitude manquantes ou de longueurs différentes")
+        window = _requested_window(params)
+        return b"".join(_window_payload(self._lookup(float(lat), float(lon), key), window)
+                        for lat, lon in zip(latitudes, longitudes))
+
+    def _lookup(self, latitude, longitude, key):
+        location = (round(latitude, 4), round(longitude, 4))
+        payload = self._payloads.get((location, key))
+        if payload is not None:
+            return payload
+        candidates = self._by_key.get(key)
+        if not self.nearest or not candidates:
+            raise KeyError(f"Aucune fixture pour {location} (variables {key})")
+        closest = min(candidates, key=lambda c: (c[0] - latitude) ** 2 + (c[1] - longitude) ** 2)
+        return self._payloads[(closest, key)]
+
+
+def _write_manifest(directory, entries):
+    path = os.path.join(directory, MANIFEST)
+    existing = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            existing = json.load(f)["fixtures"]
+    files = {entry["file"] for entry in entries}
+    merged = [entry for entry in existing if entry["file"] not in files] + entries
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"fixtures": merged}, f, indent=2)
+
+
+def _fixture_params(latitude, longitude, fields):
+    selected = rp._resolve_fields(fields)
+    return rp._weather_params(latitude, longitude, selected)
+
+
+def record_fixtures(locations, directory, fields=None, url=None):
+    """
+    Enregistre les réponses brutes de l'API réelle (une fixture par lieu).
+
+    Parameters:
+    locations (iterable): Couples (latitude, longitude), ex: VILLES_PREDEFINIES.values()
+    directory (str): Répertoire de destination (créé si besoin)
+    fields (dict): Jeu de variables, comme pour get_weather_data (None = complet)
+    url (str): Point d'accès (OPENMETEO_URL par défaut)
+
+    Returns:
+    list: Entrées ajoutées au manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+    url = url or rp.OPENMETEO_URL
+    entries = []
+    with requests.Session() as session:
+        for latitude, longitude in locations:
+            params = _fixture_params(latitude, longitude, fields)
+            response = session.get(url, params={**params, "format": "flatbuffers"}, timeout=30)
+            response.raise_for_status()
+            entries.append(_save_fixture(directory, params, response.content, source=url))
+            print(f"📼 Fixture enregistrée : {entries[-1]['file']} ({len(response.content)} octets)")
+    _write_manifest(directory, entries)
+    return entries
+
+
+def _save_fixture(directory, params, payload, source):
+    key = variables_key(params)
+    name = _fixture_name(params["latitude"], params["longitude"], key)
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(payload)
+    return {
+        "file": name,
+        "latitude": params["latitude"],
+        "longitude": params["longitude"],
+        "variables": key,
+        "params": params,
+        "source": source,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+# ------------------------
+# Fixtures synthétiques (sans réseau)
+# ------------------------
+# Champs scalaires de VariableWithValues recopiés au fenêtrage : (slot, accesseur, type)
+_VARIABLE_FIELDS = (
+    (0, "Variable", "Uint8"), (1, "Unit", "Uint8"), (5, "Altitude", "Int16"),
+    (6, "Aggregation", "Uint8"), (7, "PressureLevel", "Int16"), (8, "Depth", "Int16"),
+    (9, "DepthTo", "Int16"), (10, "EnsembleMember", "Int16"), (11, "PreviousDay", "Int16"),
+    (12, "Probability", "Uint8"),
+)
+
+
+def _build_variable(builder, value=None, values=None, values_int64=None, fields=()):
+    # Table VariableWithValues : variable(0), unit(1), value(2), values(3), values_int64(4),
+    # altitude(5) ... probability(12) ; `fields` : [(slot, type, valeur)] de _VARIABLE_FIELDS
+    values_offset = int64_offset = None
+    if values is not None:
+        values_offset = builder.CreateNumpyVector(np.asarray(values, dtype=np.float32))
+    if values_int64 is not None:
+        int64_offset = builder.CreateNumpyVector(np.asarray(values_int64, dtype=np.int64))
+    builder.StartObject(13)
+    for slot, kind, field_value in fields:
+        getattr(builder, f"Prepend{kind}Slot")(slot, field_value, 0)
+    if value is not None:
+        builder.PrependFloat32Slot(2, value, 0.0)
+    if values_offset is not None:
+        builder.PrependUOffsetTRelativeSlot(3, values_offset, 0)
+    if int64_offset is not None:
+        builder.PrependUOffsetTRelativeSlot(4, int64_offset, 0)
+    return builder.EndObject()
+
+
+def _build_block(builder, start, end, interval, variables):
+    # Table VariablesWithTime : time(0), time_end(1), interval(2), variables(3)
+    builder.StartVector(4, len(variables), 4)
+    for offset in reversed(variables):
+        builder.PrependUOffsetTRelative(offset)
+    vector = builder.EndVector()
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, end, 0)
+    builder.PrependInt32Slot(2, interval, 0)
+    builder.PrependUOffsetTRelativeSlot(3, vector, 0)
+    return builder.EndObject()
+
+
+def synthesize_payload(params, seed=0, start=None, days=7):
+    """
+    Réponse FlatBuffers plausible et reproductible pour des paramètres de requête
+    (un seul lieu). `start` : epoch du premier pas (minuit UTC du jour par défaut).
+    """
+    import flatbuffers
+
+    latitude, longitude = float(params["latitude"]), float(params["longitude"])
+    location_seed = int(hashlib.sha1(f"{latitude:.4f}|{longitude:.4f}|{seed}".encode()).hexdigest()[:8], 16)
+    rng = np.random.default_rng(location_seed)
+    start = (int(time.time()) // 86400) * 86400 if start is None else int(start)
+    hours = days * 24
+    builder = flatbuffers.Builder(1 << 16)
+
+    blocks = {}
+    current = _split(params.get("current"))
+    if current:
+        variables = [_build_variable(builder, value=float(rng.uniform(0, 30))) for _ in current]
+        blocks["current"] = _build_block(builder, start, start + 900, 900, variables)
+    hourly = _split(params.get("hourly"))
+    if hourly:
+        variables = [_build_variable(builder, values=rng.uniform(0, 30, hours)) for _ in hourly]
+        blocks["hourly"] = _build_block(builder, start, start + hours * 3600, 3600, variables)
+    daily = _split(params.get("daily"))
+    if daily:
+        variables = []
+        for name in daily:
+            if name in rp.EPOCH_VARIABLES:
+                offset = 6 * 3600 if name == "sunrise" else 18 * 3600
+                variables.append(_build_variable(builder, values_int64=start + np.arange(days) * 86400 + offset))
+            else:
+                variables.append(_build_variable(builder, values=rng.uniform(0, 30, days)))
+        blocks["daily"] = _build_block(builder, start, start + days * 86400, 86400, variables)
+
+    tz = builder.CreateString("GMT")
+    # Table WeatherApiResponse : latitude(0), longitude(1), elevation(2), utc_offset_seconds(6),
+    # timezone(7), current(9), daily(10), hourly(11)
+    builder.StartObject(16)
+    builder.PrependFloat32Slot(0, latitude, 0)
+    builder.PrependFloat32Slot(1, longitude, 0)
+    builder.PrependFloat32Slot(2, float(rng.uniform(0, 500)), 0)
+    builder.PrependUOffsetTRelativeSlot(7, tz, 0)
+    for slot, section in ((9, "current"), (10, "daily"), (11, "hourly")):
+        if section in blocks:
+            builder.PrependUOffsetTRelativeSlot(slot, blocks[section], 0)
+    builder.Finish(builder.EndObject())
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, "little") + message
+
+
+# ------------------------
+# Fenêtres forecast_hours / past_hours / forecast_days
+# ------------------------
+def _int_param(params, name):
+    values = _split(params.get(name))
+    return int(values[0]) if values else None
+
+
+def _requested_window(params):
+    """Fenêtre demandée : (forecast_hours, past_hours, forecast_days), ou None si aucune."""
+    window = tuple(_int_param(params, name) for name in ("forecast_hours", "past_hours", "forecast_days"))
+    return None if window == (None, None, None) else window
+
+
+def _window_range(block, section, window, now):
+    """Pas [début, fin) à garder d'un bloc hourly / daily (None = bloc inchangé)."""
+    forecast_hours, past_hours, forecast_days = window
+    start, interval = block.Time(), block.Interval()
+    if section == "hourly" and (forecast_hours is not None or past_hours is not None):
+        # Comme l'API : à partir de l'heure courante, moins past_hours
+        first = (now // 3600 - (past_hours or 0)) * 3600
+        last = first + ((past_hours or 0) + (forecast_hours if forecast_hours is not None else 0)) * 3600
+        if forecast_hours is None:
+            last = block.TimeEnd()
+    elif forecast_days is not None:
+        first, last = start, start + forecast_days * 86400
+    else:
+        return None
+    count = (block.TimeEnd() - start) // interval
+    begin = min(count, max(0, -(-(first - start) // interval)))
+    return begin, min(count, max(begin, -(-(last - start) // interval)))
+
+
+def _copy_block(builder, block, steps=None):
+    """Recopie un bloc VariablesWithTime, tronqué aux pas `steps` = (début, fin) si donné."""
+    variables = []
+    for j in range(block.VariablesLength()):
+        variable = block.Variables(j)
+        fields = [(slot, kind, getattr(variable, name)()) for slot, name, kind in _VARIABLE_FIELDS]
+        values = None if variable.ValuesIsNone() else variable.ValuesAsNumpy()
+        values_int64 = None if variable.ValuesInt64IsNone() else variable.ValuesInt64AsNumpy()
+        if steps is not None:
+            values = None if values is None else values[steps[0]:steps[1]]
+            values_int64 = None if values_int64 is None else values_int64[steps[0]:steps[1]]
+        scalar = variable.Value() if values is None and values_int64 is None else None
+        variables.append(_build_variable(builder, value=scalar, values=values, values_int64=values_int64,
+                                         fields=fields))
+    start, end, interval = block.Time(), block.TimeEnd(), block.Interval()
+    if steps is not None:
+        start, end = start + steps[0] * interval, start + steps[1] * interval
+    return _build_block(builder, start, end, interval, variables)
+
+
+def _window_payload(payload, window, now=None):
+    """
+    Réponse d'un lieu (message FlatBuffers préfixé de sa taille) ré-encodée avec ses
+    séries hourly / daily limitées à `window` (cf. _requested_window ; None = inchangée).
+    """
+    if window is None:
+        return payload
+    import flatbuffers
+    from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+
+    now = int(time.time()) if now is None else int(now)
+    response = WeatherApiResponse.GetRootAs(payload, 4)
+    builder = flatbuffers.Builder(len(payload))
+    blocks = {}
+    for slot, section in ((9, "current"), (10, "daily"), (11, "hourly")):
+        block = getattr(response, section.capitalize())()
+        if block is not None:
+            steps = None if section == "current" else _window_range(block, section, window, now)
+            blocks[slot] = _copy_block(builder, block, steps)
+    strings = {slot: builder.CreateString(text) for slot, text in
+               ((7, response.Timezone()), (8, response.TimezoneAbbreviation())) if text is not None}
+
+    # Table WeatherApiResponse : latitude(0), longitude(1), elevation(2), generation_time_milliseconds(3),
+    # location_id(4), model(5), utc_offset_seconds(6), timezone(7), timezone_abbreviation(8), current(9)...
+    builder.StartObject(16)
+    builder.PrependFloat32Slot(0, response.Latitude(), 0)
+    builder.PrependFloat32Slot(1, response.Longitude(), 0)
+    builder.PrependFloat32Slot(2, response.Elevation(), 0)
+    builder.PrependFloat32Slot(3, response.GenerationTimeMilliseconds(), 0)
+    builder.PrependInt64Slot(4, response.LocationId(), 0)
+    builder.PrependUint8Slot(5, response.Model(), 0)
+    builder.PrependInt32Slot(6, response.UtcOffsetSeconds(), 0)
+    for slot, offset in {**strings, **blocks}.items():
+        builder.PrependUOffsetTRelativeSlot(slot, offset, 0)
+    builder.Finish(builder.EndObject())
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, "little") + message
+
+
+def synthesize_fixtures(locations, directory, fields=None, seed=0, start=None):
+    """Comme record_fixtures, mais sans réseau : réponses synthétiques déterministes."""
+    os.makedirs(directory, exist_ok=True)
+    entries = []
+    for latitude, longitude in locations:
+        params = _fixture_params(latitude, longitude, fields)
+        payload = synthesize_payload(params, seed=seed, start=start)
+        entries.append(_save_fixture(directory, params, payload, source=f"synthetic:{seed}"))
+    _write_manifest(directory, entries)
+    return entries
+
+
+# ------------------------
+# Rejeu
+# ------------------------
+class ReplayAdapter(BaseAdapter):
+    """
+    Adaptateur de transport requests qui répond à partir d'un FixtureSet.
+
+    Parameters:
+    fixtures (FixtureSet | str): Fixtures ou répertoire de fixtures
+    latency (float): Délai ajouté à chaque réponse (secondes)
+    """
+
+    def __init__(self, fixtures, latency=0.0):
+        super().__init__()
+        self.fixtures = FixtureSet(fixtures) if isinstance(fixtures, str) else fixtures
+        self.latency = latency
+        self.counters = {"requests": 0, "misses": 0, "bytes": 0}
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        params = parse_qs(urlparse(request.url).query)
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        try:
+            body = self.fixtures.payload(params)
+            response.status_code, response.reason = 200, "OK"
+            response.headers["Content-Type"] = "application/octet-stream"
+        except KeyError as e:
+            body = json.dumps({"error": True, "reason": str(e)}).encode("utf-8")
+            response.status_code, response.reason = 404, "Not Found"
+            response.headers["Content-Type"] = "application/json"
+        response._content = body
+        response.encoding = None
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["bytes"] += len(body)
+            if response.status_code != 200:
+                self.counters["misses"] += 1
+        return response
+
+    def close(self):
+        pass
+
+
+def install_replay(fixtures, latency=0.0):
+    """
+    Fait passer les appels Open-Meteo de requete_page1 par un ReplayAdapter
+    (close_http_clients() rétablit la session réseau). Renvoie l'adaptateur.
+    """
+    adapter = ReplayAdapter(fixtures, latency=latency)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    rp.use_http_session("openmeteo", session)
+    return adapter
+
+
+class ReplayServer:
+    """
+    Serveur HTTP local (thread démon) qui rejoue les fixtures sur GET /v1/forecast.
+
+    Parameters:
+    fixtures (FixtureSet | str): Fixtures ou répertoire de fixtures
+    host (str), port (int): Adresse d'écoute (port 0 = port libre)
+    latency (float): Délai ajouté à chaque réponse (secondes)
+    """
+
+    def __init__(self, fixtures, host="127.0.0.1", port=0, latency=0.0):
+        self.adapter = ReplayAdapter(fixtures, latency=latency)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/forecast"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="openmeteo-replay", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        adapter = self.adapter
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                response = adapter.send(requests.Request("GET", f"http://replay{self.path}").prepare())
+                self.send_response(response.status_code)
+                self.send_header("Content-Type", response.headers["Content-Type"])
+                self.send_header("Content-Length", str(len(response.content)))
+                self.end_headers()
+                self.wfile.write(response.content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fixtures Open-Meteo : enregistrement et rejeu hors ligne")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("record", "synthesize"):
+        command = commands.add_parser(name)
+        command.add_argument("directory")
+        command.add_argument("--location", action="append", metavar="LAT,LON",
+                             help="Lieu à enregistrer (répétable) ; par défaut les villes prédéfinies")
+        if name == "synthesize":
+            command.add_argument("--seed", type=int, default=0)
+
+    serve = commands.add_parser("serve")
+    serve.add_argument("directory")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8766)
+    serve.add_argument("--latency", type=float, default=0.0)
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        server = ReplayServer(args.directory, args.host, args.port, args.latency)
+        print(f"📼 Rejeu Open-Meteo sur {server.url} ({len(server.adapter.fixtures)} fixtures, Ctrl+C pour arrêter)")
+        try:
+            server._server.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
+    else:
+        if args.location:
+            locations = [tuple(float(v) for v in loc.split(",")) for loc in args.location]
+        else:
+            locations = DEFAULT_LOCATIONS
+        if args.command == "record":
+            record_fixtures(locations, args.directory)
+        else:
+            synthesize_fixtures(locations, args.directory, seed=args.seed)
+            print(f"📼 {len(locations)} fixtures synthétiques écrites dans {args.directory}")
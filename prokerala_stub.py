@@ -0,0 +1,168 @@
+"""
+Serveur local imitant l'API Prokerala (jeton OAuth + horoscope du jour), pour
+développer et tester le moteur d'horoscope sans réseau ni quota.
+
+Usage :
+    python prokerala_stub.py --port 8765
+    PROKERALA_BASE_URL=http://127.0.0.1:8765 streamlit run Accueil.py
+
+Depuis Python :
+    with ProkeralaStub() as stub:
+        os.environ["PROKERALA_BASE_URL"] = stub.url   # ou _HoroscopeEngine(base_url=stub.url)
+        ...
+        print(stub.stats())
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SIGNS = {
+    "aries": (1, "Aries"), "taurus": (2, "Taurus"), "gemini": (3, "Gemini"),
+    "cancer": (4, "Cancer"), "leo": (5, "Leo"), "virgo": (6, "Virgo"),
+    "libra": (7, "Libra"), "scorpio": (8, "Scorpio"), "sagittarius": (9, "Sagittarius"),
+    "capricorn": (10, "Capricorn"), "aquarius": (11, "Aquarius"), "pisces": (12, "Pisces"),
+}
+
+
+class ProkeralaStub:
+    """
+    Serveur HTTP local (thread démon) répondant à POST /token et GET /v2/horoscope/daily.
+
+    Parameters:
+    host (str), port (int): Adresse d'écoute (port 0 = port libre choisi par le système)
+    token_ttl (int): Durée de validité des jetons émis (secondes)
+    latency (float): Délai ajouté à chaque réponse (secondes)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, token_ttl=3600, latency=0.0):
+        self.token_ttl = token_ttl
+        self.latency = latency
+        self.counters = {"tokens": 0, "horoscopes": 0, "unauthorized": 0}
+        self._tokens = {}  # jeton -> expiration
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="prokerala-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def expire_tokens(self):
+        """Invalide tous les jetons émis (pour tester le renouvellement sur 401)."""
+        with self._lock:
+            self._tokens.clear()
+
+    # --- Réponses ---
+    def _issue_token(self):
+        with self._lock:
+            token = f"stub-token-{next(self._ids)}"
+            self._tokens[token] = time.time() + self.token_ttl
+            self.counters["tokens"] += 1
+        return {"access_token": token, "token_type": "Bearer", "expires_in": self.token_ttl}
+
+    def _authorized(self, header):
+        token = (header or "").removeprefix("Bearer ").strip()
+        with self._lock:
+            valid = self._tokens.get(token, 0) > time.time()
+            if not valid:
+                self.counters["unauthorized"] += 1
+        return valid
+
+    def _horoscope(self, sign):
+        sign_id, sign_name = SIGNS[sign]
+        with self._lock:
+            self.counters["horoscopes"] += 1
+        return {
+            "status": "ok",
+            "data": {
+                "daily_prediction": {
+                    "sign_id": sign_id,
+                    "sign_name": sign_name,
+                    "date": date.today().isoformat(),
+                    "prediction": f"A calm day for {sign_name}: stub prediction number {sign_id}.",
+                }
+            },
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, payload):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                if urlparse(self.path).path != "/token":
+                    return self._send(404, {"error": "not found"})
+                if form.get("grant_type") != ["client_credentials"] or not form.get("client_id"):
+                    return self._send(400, {"error": "invalid_request"})
+                self._send(200, stub._issue_token())
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != "/v2/horoscope/daily":
+                    return self._send(404, {"error": "not found"})
+                if not stub._authorized(self.headers.get("Authorization")):
+                    return self._send(401, {"error": "invalid_token"})
+                sign = parse_qs(url.query).get("sign", [""])[0].lower()
+                if sign not in SIGNS:
+                    return self._send(400, {"error": f"unknown sign {sign!r}"})
+                self._send(200, stub._horoscope(sign))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur local imitant l'API Prokerala")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stub = ProkeralaStub(args.host, args.port, args.token_ttl, args.latency)
+    print(f"🔮 Stand-in Prokerala sur {stub.url} (Ctrl+C pour arrêter)")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -4,13 +4,31 @@ Utilise le modèle LLM pour créer des recommandations personnalisées
 """
 
 import os
+import numpy as np
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
+from requete_page1 import get_httpx_client
 
 load_dotenv()
 
 
+def _hourly_values(hourly, name: str) -> list:
+    """
+    Valeurs non nulles d'une variable horaire.
+    Lit directement la colonne NumPy si `hourly` est un WeatherFrame (ou ses records),
+    sinon parcourt la liste de dictionnaires.
+    """
+    column = getattr(getattr(hourly, "frame", hourly), "column", None)
+    if column is not None:
+        values = column(name)
+        if values is None:
+            return []
+        values = np.asarray(values, dtype=float)
+        return values[~np.isnan(values)].tolist()
+    return [h.get(name) for h in hourly if h.get(name) is not None]
+
+
 def generate_recommendations(weather_data: dict, ville: str) -> dict:
     """
     Génère des recommandations intelligentes basées sur la météo et la ville.
@@ -36,6 +54,7 @@ def generate_recommendations(weather_data: dict, ville: str) -> dict:
             max_tokens=2000,
             timeout=60,
             groq_api_key=api_key,
+            http_client=get_httpx_client("groq"),
         )
         
         # Extraire les données pertinentes
@@ -57,24 +76,11 @@ def generate_recommendations(weather_data: dict, ville: str) -> dict:
         snowfall = current.get("snowfall", 0)
         
         # Statistiques horaires (24h)
-        rain_probs = []
-        uv_values = []
-        temps_hourly = []
-        wind_speeds = []
-        cloud_covers = []
-        
-        if hourly:
-            for h in hourly:
-                if h.get("precipitation_probability") is not None:
-                    rain_probs.append(h.get("precipitation_probability"))
-                if h.get("uv_index") is not None:
-                    uv_values.append(h.get("uv_index"))
-                if h.get("temperature_2m") is not None:
-                    temps_hourly.append(h.get("temperature_2m"))
-                if h.get("wind_speed_10m") is not None:
-                    wind_speeds.append(h.get("wind_speed_10m"))
-                if h.get("cloud_cover") is not None:
-                    cloud_covers.append(h.get("cloud_cover"))
+        rain_probs = _hourly_values(hourly, "precipitation_probability")
+        uv_values = _hourly_values(hourly, "uv_index")
+        temps_hourly = _hourly_values(hourly, "temperature_2m")
+        wind_speeds = _hourly_values(hourly, "wind_speed_10m")
+        cloud_covers = _hourly_values(hourly, "cloud_cover")
         
         rain_prob_max = max(rain_probs) if rain_probs else 0
         rain_prob_avg = sum(rain_probs) / len(rain_probs) if rain_probs else 0
@@ -0,0 +1,452 @@
+"""
+Couche de résilience partagée par les appels aux API amont
+(Open-Meteo, Nominis, Photon, Blagues, Prokerala, Groq).
+
+Pour chaque API amont (un hôte) :
+- un nombre maximal de requêtes simultanées (sémaphore) : au-delà, l'appelant
+  attend au plus UPSTREAM_QUEUE_TIMEOUT secondes puis échoue immédiatement ;
+- un disjoncteur : après CIRCUIT_FAILURE_THRESHOLD échecs consécutifs, les appels
+  échouent sans toucher le réseau pendant CIRCUIT_RECOVERY_TIMEOUT secondes, puis
+  une seule requête de test (demi-ouvert) décide de la réouverture ;
+- un délai par défaut, plafonné par l'échéance courante (deadline) de l'appelant.
+
+Les échéances se propagent par contextvars : `with deadline(8): ...` borne tous
+les appels HTTP faits dans ce bloc, y compris dans les threads lancés via
+propagate(). Les refus lèvent UpstreamUnavailable, une
+requests.exceptions.ConnectionError : les gestionnaires d'erreurs réseau existants
+s'appliquent tels quels (et requests_cache peut servir sa réponse périmée).
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "30"))
+UPSTREAM_QUEUE_TIMEOUT = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "2"))
+
+# Requêtes simultanées max et délai par défaut (secondes) par API amont ;
+# surchargeables par UPSTREAM_<NOM>_CONCURRENCY / UPSTREAM_<NOM>_TIMEOUT
+UPSTREAM_DEFAULTS = {
+    "openmeteo": {"concurrency": 8, "timeout": 10},
+    "nominis": {"concurrency": 2, "timeout": 5},
+    "photon": {"concurrency": 4, "timeout": 5},
+    "blagues": {"concurrency": 2, "timeout": 5},
+    "prokerala": {"concurrency": 6, "timeout": 10},
+    "groq": {"concurrency": 4, "timeout": 60},
+}
+DEFAULT_UPSTREAM = {"concurrency": 4, "timeout": 10}
+
+# Statuts HTTP comptés comme une défaillance de l'API amont (les autres 4xx sont des erreurs de l'appelant)
+FAILURE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class UpstreamUnavailable(requests.exceptions.ConnectionError):
+    """
+    Appel refusé sans toucher le réseau.
+
+    reason : "circuit_open" (disjoncteur ouvert), "busy" (pas de place dans la limite
+    de concurrence à temps) ou "deadline" (échéance de l'appelant dépassée).
+    """
+
+    def __init__(self, upstream, reason, message=None):
+        self.upstream = upstream
+        self.reason = reason
+        super().__init__(message or f"{upstream} indisponible ({reason})")
+
+
+# ------------------------
+# Échéances
+# ------------------------
+_deadline = contextvars.ContextVar("upstream_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Borne le temps restant pour tous les appels amont du bloc (échéance la plus
+    proche si une échéance est déjà en cours). None = pas de nouvelle borne.
+    """
+    current = _deadline.get()
+    target = current if seconds is None else time.monotonic() + seconds
+    if current is not None:
+        target = min(target, current)
+    token = _deadline.set(target)
+    try:
+        yield target
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Secondes restantes avant l'échéance courante (None s'il n'y en a pas)."""
+    target = _deadline.get()
+    return None if target is None else target - time.monotonic()
+
+
+def propagate(func, timeout=None):
+    """
+    Enveloppe `func` pour un autre thread : il s'exécutera avec l'échéance de
+    l'appelant (capturée maintenant), resserrée à `timeout` secondes si fourni.
+    """
+    target = _deadline.get()
+    if timeout is not None:
+        limit = time.monotonic() + timeout
+        target = limit if target is None else min(target, limit)
+
+    def run(*args, **kwargs):
+        token = _deadline.set(target)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _deadline.reset(token)
+    return run
+
+
+def _cap_timeout(timeout, left):
+    """Plafonne un délai requests/httpx (nombre ou tuple connect/read) au temps restant."""
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+    if isinstance(timeout, tuple):
+        return tuple(left if t is None else min(t, left) for t in timeout)
+    return min(timeout, left)
+
+
+# ------------------------
+# Disjoncteur
+# ------------------------
+class CircuitBreaker:
+    """
+    Disjoncteur fermé / ouvert / demi-ouvert.
+
+    Parameters:
+    failure_threshold (int): Échecs consécutifs avant ouverture
+    recovery_timeout (float): Secondes d'ouverture avant la requête de test
+    half_open_max (int): Requêtes de test simultanées autorisées en demi-ouvert
+    """
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 recovery_timeout=CIRCUIT_RECOVERY_TIMEOUT, half_open_max=1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max = half_open_max
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True si un appel peut partir maintenant (compte une requête de test en demi-ouvert)."""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    return False
+                self.state = "half_open"
+                self._probes = 0
+            if self.state == "half_open":
+                if self._probes >= self.half_open_max:
+                    return False
+                self._probes += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probes = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probes = 0
+
+    def release_probe(self):
+        """Requête de test abandonnée sans verdict (ex: refusée faute de place)."""
+        with self._lock:
+            if self.state == "half_open" and self._probes > 0:
+                self._probes -= 1
+
+    def retry_after(self):
+        """Secondes avant la prochaine requête de test (0 si le disjoncteur n'est pas ouvert)."""
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+
+# ------------------------
+# API amont
+# ------------------------
+class _Call:
+    """Appel en cours (renvoyé par Upstream.call) : délai effectif et verdict."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.failed = False
+        self.retrying = False
+
+    def fail(self):
+        """Compte l'appel comme une défaillance sans lever d'exception (ex: statut 503)."""
+        self.failed = True
+
+    def retry(self):
+        """Tentative ratée qui sera réessayée : pas de verdict, l'appel suivant tranchera."""
+        self.retrying = True
+
+
+class Upstream:
+    """
+    Limites partagées d'une API amont : concurrence, disjoncteur, délai par défaut.
+
+    Parameters:
+    name (str): Nom de l'API amont ("openmeteo", "photon", ...)
+    concurrency (int): Requêtes simultanées max
+    timeout (float): Délai par défaut d'une requête (secondes)
+    breaker (CircuitBreaker): Disjoncteur (un nouveau par défaut)
+    """
+
+    def __init__(self, name, concurrency, timeout, breaker=None):
+        self.name = name
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.counters = {"calls": 0, "failures": 0, "rejected_open": 0, "rejected_busy": 0, "rejected_deadline": 0}
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _acquire(self, timeout, blocking):
+        left = remaining()
+        if left is not None and left <= 0:
+            self._count("rejected_deadline")
+            raise UpstreamUnavailable(self.name, "deadline")
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            raise UpstreamUnavailable(
+                self.name, "circuit_open",
+                f"{self.name} indisponible (disjoncteur ouvert, nouvel essai dans {self.breaker.retry_after():.0f} s)",
+            )
+        wait_for = UPSTREAM_QUEUE_TIMEOUT if left is None else min(UPSTREAM_QUEUE_TIMEOUT, left)
+        if not self._slots.acquire(blocking, wait_for if blocking else None):
+            self.breaker.release_probe()
+            self._count("rejected_busy")
+            raise UpstreamUnavailable(self.name, "busy")
+        with self._lock:
+            self._in_flight += 1
+            self.counters["calls"] += 1
+        return _Call(_cap_timeout(self.timeout if timeout is None else timeout, remaining()))
+
+    def _release(self, call, error):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+        if error is not None or call.failed:
+            self._count("failures")
+            self.breaker.record_failure()
+        elif call.retrying:
+            self.breaker.release_probe()  # la tentative suivante reprend la requête de test
+        else:
+            self.breaker.record_success()
+
+    @contextmanager
+    def call(self, timeout=None):
+        """
+        Réserve une place pour un appel (UpstreamUnavailable si impossible) et
+        renvoie un _Call dont `.timeout` est le délai à utiliser ; une exception
+        dans le bloc ou call.fail() compte comme une défaillance pour le disjoncteur.
+        """
+        call = self._acquire(timeout, blocking=True)
+        error = None
+        try:
+            yield call
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(call, error)
+
+    async def run_async(self, coroutine, timeout=None):
+        """
+        Exécute une coroutine dans les limites de l'API amont, délai compris.
+        Jamais bloquant pour la boucle asyncio : refus immédiat s'il n'y a pas de place.
+        """
+        try:
+            call = self._acquire(timeout, blocking=False)
+        except UpstreamUnavailable:
+            coroutine.close()  # jamais lancée : évite l'avertissement "never awaited"
+            raise
+        error = None
+        try:
+            return await asyncio.wait_for(coroutine, timeout=call.timeout)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(call, error)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["in_flight"] = self._in_flight
+        stats["state"] = self.breaker.state
+        stats["concurrency"] = self.concurrency
+        return stats
+
+
+_upstreams = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name):
+    """Limites partagées (créées au premier accès) d'une API amont."""
+    with _upstreams_lock:
+        upstream = _upstreams.get(name)
+        if upstream is None:
+            defaults = UPSTREAM_DEFAULTS.get(name, DEFAULT_UPSTREAM)
+            prefix = f"UPSTREAM_{name.upper()}_"
+            upstream = Upstream(
+                name,
+                concurrency=int(os.getenv(prefix + "CONCURRENCY", defaults["concurrency"])),
+                timeout=float(os.getenv(prefix + "TIMEOUT", defaults["timeout"])),
+            )
+            _upstreams[name] = upstream
+        return upstream
+
+
+def configure_upstream(name, concurrency=None, timeout=None, failure_threshold=None, recovery_timeout=None):
+    """Remplace les limites d'une API amont (les appels en cours gardent les anciennes)."""
+    current = get_upstream(name)
+    breaker = CircuitBreaker(
+        failure_threshold=current.breaker.failure_threshold if failure_threshold is None else failure_threshold,
+        recovery_timeout=current.breaker.recovery_timeout if recovery_timeout is None else recovery_timeout,
+    )
+    upstream = Upstream(
+        name,
+        concurrency=current.concurrency if concurrency is None else concurrency,
+        timeout=current.timeout if timeout is None else timeout,
+        breaker=breaker,
+    )
+    with _upstreams_lock:
+        _upstreams[name] = upstream
+    return upstream
+
+
+def get_upstream_stats():
+    """État de chaque API amont déjà sollicitée (disjoncteur, appels en cours, refus)."""
+    with _upstreams_lock:
+        upstreams = list(_upstreams.values())
+    return {upstream.name: upstream.stats() for upstream in upstreams}
+
+
+# ------------------------
+# Intégration requests / httpx
+# ------------------------
+class GuardedAdapter(HTTPAdapter):
+    """
+    Adaptateur requests poolé qui fait passer chaque tentative par les limites de
+    son API amont. Les nouvelles tentatives (politique urllib3 `retry` : nombre,
+    backoff, statuts) sont faites ici plutôt que dans urllib3, pour s'arrêter dès
+    que le disjoncteur s'ouvre ou que l'échéance ne laisse plus le temps d'attendre.
+    Le disjoncteur ne voit qu'une issue par appel : un échec une fois les tentatives
+    épuisées, pas un par tentative.
+
+    Parameters:
+    upstream (str): Nom de l'API amont (cf. get_upstream)
+    retry (urllib3.util.Retry | int): Politique de nouvelles tentatives (0 = aucune)
+    **kwargs: pool_connections, pool_maxsize... (cf. HTTPAdapter)
+    """
+
+    def __init__(self, upstream, retry=0, **kwargs):
+        super().__init__(max_retries=0, **kwargs)
+        self.upstream_name = upstream
+        self.retry = retry
+
+    def _attempts(self, method):
+        retry = self.retry
+        if not retry:
+            return 1
+        if isinstance(retry, int):
+            return retry + 1
+        allowed = getattr(retry, "allowed_methods", None)
+        if allowed and method.upper() not in allowed:
+            return 1
+        return (retry.total or 0) + 1
+
+    def _retry_status(self, status):
+        forcelist = getattr(self.retry, "status_forcelist", None) or ()
+        return status in forcelist or status in FAILURE_STATUSES
+
+    def _backoff(self, attempt):
+        factor = getattr(self.retry, "backoff_factor", 0) or 0
+        delay = factor * (2 ** attempt)
+        left = remaining()
+        if left is not None and delay >= left:
+            return None  # plus le temps d'attendre puis de réessayer
+        return delay
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        upstream = get_upstream(self.upstream_name)
+        attempts = self._attempts(request.method or "GET")
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            # Une seule issue par appel pour le disjoncteur : les tentatives réessayées n'en ont pas
+            with upstream.call(timeout) as call:
+                try:
+                    response = super().send(request, stream=stream, timeout=call.timeout,
+                                            verify=verify, cert=cert, proxies=proxies)
+                    if not stream:
+                        response.content  # corps lu dans la place réservée
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    delay = None if last else self._backoff(attempt)
+                    if delay is None:
+                        raise
+                    call.retry()
+                else:
+                    if not self._retry_status(response.status_code):
+                        return response
+                    delay = None if last else self._backoff(attempt)
+                    if delay is None:
+                        call.fail()
+                        return response
+                    call.retry()
+                    response.close()
+            time.sleep(delay)
+
+
+def guarded_httpx_client(upstream, **kwargs):
+    """httpx.Client dont chaque requête passe par les limites de l'API amont (ex: client Groq)."""
+    import httpx
+
+    class GuardedTransport(httpx.HTTPTransport):
+        def handle_request(self, request):
+            timeouts = request.extensions.get("timeout") or {}
+            with get_upstream(upstream).call(timeouts.get("read")) as call:
+                if timeouts:
+                    request.extensions["timeout"] = {
+                        key: _cap_timeout(value, remaining()) for key, value in timeouts.items()
+                    }
+                response = super().handle_request(request)
+                if response.status_code in FAILURE_STATUSES:
+                    call.fail()
+                return response
+
+    return httpx.Client(transport=GuardedTransport(), **kwargs)
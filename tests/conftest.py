@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import forecast_cache  # noqa: E402
+import forecast_store  # noqa: E402
+import openmeteo_replay  # noqa: E402
+import requete_page1 as rp  # noqa: E402
+import resilience  # noqa: E402
+
+LATITUDE, LONGITUDE = 48.8566, 2.3522
+
+
+def record_params(adapter):
+    """Paramètres de chaque requête reçue par le rejeu."""
+    seen = []
+    send = adapter.send
+
+    def recording_send(request, **kwargs):
+        seen.append(parse_qs(urlparse(request.url).query))
+        return send(request, **kwargs)
+
+    adapter.send = recording_send
+    return seen
+
+
+def _drain_refreshes(timeout=10):
+    """Attend la fin des rafraîchissements en arrière-plan lancés par le test."""
+    deadline = time.monotonic() + timeout
+    while rp._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def cache():
+    """Cache des prévisions en mémoire seule, historique désactivé."""
+    cache = forecast_cache.configure_forecast_cache(backend="none")
+    forecast_store.configure_forecast_store(enabled=False)
+    with rp._refresh_lock:
+        rp._forecast_generations.clear()
+    resilience.configure_upstream("openmeteo")  # disjoncteur neuf
+    yield cache
+    _drain_refreshes()
+    forecast_cache.configure_forecast_cache(backend="none")
+
+
+@pytest.fixture
+def replay(tmp_path, cache):
+    """
+    Open-Meteo rejoué hors ligne ; replay(fields...) synthétise les fixtures des jeux
+    de variables demandés (None = jeu complet) et renvoie le ReplayAdapter installé.
+    """
+    def install(*fields_list, start=None):
+        for fields in fields_list or (None,):
+            openmeteo_replay.synthesize_fixtures([(LATITUDE, LONGITUDE)], str(tmp_path), fields=fields, start=start)
+        return openmeteo_replay.install_replay(str(tmp_path))
+
+    yield install
+    _drain_refreshes()
+    rp.close_http_clients()
@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+import time
+import types
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import chart_cache
+
+
+@pytest.fixture
+def page_main(tmp_path, monkeypatch):
+    """__main__ remplacé par un script de page, comme le fait Streamlit ; renvoie le témoin d'exécution."""
+    marker = tmp_path / "page_executee"
+    script = tmp_path / "page.py"
+    script.write_text(f"open({str(marker)!r}, 'w').close()\n", encoding="utf-8")
+    page = types.ModuleType("__main__")
+    page.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", page)
+    return marker
+
+
+def test_workers_never_run_the_page_script(page_main):
+    pool = chart_cache.create_chart_executor(2)
+    try:
+        futures = [pool.submit(pow, 2, n) for n in range(4)]
+        assert [future.result(60) for future in futures] == [1, 2, 4, 8]
+        with pytest.raises(ZeroDivisionError):
+            pool.submit(divmod, 1, 0).result(60)
+    finally:
+        pool.shutdown()
+    assert not page_main.exists()
+
+
+def test_dead_worker_breaks_the_pool():
+    pool = chart_cache.create_chart_executor(1)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result(60)
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(pow, 2, 2)
+    finally:
+        pool.shutdown()
+
+
+def test_parallel_rendering_is_opt_in():
+    env = {name: value for name, value in os.environ.items() if name != "CHART_RENDER_WORKERS"}
+    code = "import chart_cache; print(chart_cache.CHART_RENDER_WORKERS, chart_cache.get_chart_executor())"
+    output = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(chart_cache.__file__), env=env,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.split() == ["0", "None"]
+
+
+def test_killed_pool_fails_running_and_queued_tasks():
+    pool = chart_cache.create_chart_executor(1)
+    running, queued = pool.submit(time.sleep, 60), pool.submit(pow, 2, 2)
+    time.sleep(0.5)
+    pool.shutdown(wait=True, kill=True)
+    for future in (running, queued):
+        with pytest.raises(BrokenProcessPool):
+            future.result(5)
+
+
+class _StuckPool:
+    """Pool dont une tâche ne se termine jamais ; les autres sont rendues tout de suite."""
+
+    def __init__(self):
+        self.killed = False
+
+    def submit(self, fn, chart, *args):
+        future = Future()
+        if chart != "stuck":
+            future.set_result(f"pool:{chart}")
+        return future
+
+    def shutdown(self, wait=True, kill=False):
+        self.killed = kill
+
+
+def test_timeout_falls_back_to_serial_rendering(monkeypatch):
+    monkeypatch.setattr(chart_cache, "_render_chart", lambda chart, args, image_format, dpi: f"serie:{chart}")
+    pool = _StuckPool()
+
+    images = chart_cache.render_charts([("wind", ()), ("stuck", ()), ("uv", ())], executor=pool, timeout=0.1)
+
+    assert images == ["pool:wind", "serie:stuck", "pool:uv"]
+    assert pool.killed
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import recommendations_generator
+import requete_page1 as rp
+
+from conftest import LATITUDE, LONGITUDE, ROOT
+
+PAGE = os.path.join(ROOT, "pages", "1_Données météo.py")
+
+
+@pytest.fixture
+def page(replay, monkeypatch):
+    """Page de données sur Open-Meteo rejoué ; saints et recommandations sans réseau."""
+    replay()
+    monkeypatch.setattr(rp, "get_saints_data", lambda: {"nombre_saints": 1, "saints_majeurs": []})
+    monkeypatch.setattr(recommendations_generator, "generate_recommendations",
+                        lambda *args: {"success": False, "error": "hors ligne"})
+    at = AppTest.from_file(PAGE, default_timeout=120)
+    at.session_state["latitude"] = LATITUDE
+    at.session_state["longitude"] = LONGITUDE
+    at.session_state["ville_selectionnee"] = "Paris"
+    return at
+
+
+def test_every_tab_renders(page):
+    page.run()
+    assert not page.exception
+    labels = page.session_state["tab_timings"].keys()
+    assert len(labels) == 1  # seul l'onglet par défaut a été exécuté
+
+    # Libellés complets : st.segmented_control affiche l'emoji de tête comme icône
+    options = page.button_group(key="data_tab").proto.options
+    for label in [f"{option.content_icon} {option.content}" for option in options]:
+        page.session_state["data_tab"] = label
+        page.run()
+        assert not page.exception, label
+        assert label in page.session_state["tab_timings"]
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import requete_page1 as rp
+from resilience import remaining
+
+
+def _sleeper(seconds, result="ok"):
+    def fn():
+        time.sleep(seconds)
+        return result
+    return fn
+
+
+def _collect(jobs, timeouts):
+    return {name: (result, error) for name, result, error in rp.fetch_concurrently(jobs, timeouts)}
+
+
+def test_deadline_starts_when_the_job_starts(monkeypatch):
+    monkeypatch.setattr(rp, "FETCH_MAX_WORKERS", 1)
+    budgets = {}
+
+    def quick():
+        budgets["quick"] = remaining()
+        return "ok"
+
+    # "quick" attend 0.3 s derrière "slow" : plus que son délai, mais son échéance ne court pas encore
+    results = _collect({"slow": _sleeper(0.3), "quick": quick}, {"slow": 1, "quick": 0.2})
+
+    assert results == {"slow": ("ok", None), "quick": ("ok", None)}
+    assert 0.15 < budgets["quick"] <= 0.2
+
+
+def test_slow_source_times_out_with_its_http_deadline():
+    release = threading.Event()
+    seen = {}
+
+    def hung():
+        seen["budget"] = remaining()
+        release.wait(2)
+        seen["left"] = remaining()
+
+    started = time.monotonic()
+    results = _collect({"hung": hung, "fast": lambda: 1}, {"hung": 0.1})
+    elapsed = time.monotonic() - started
+    release.set()
+
+    assert results["fast"] == (1, None)
+    assert isinstance(results["hung"][1], TimeoutError)
+    assert elapsed < 1
+    assert seen["budget"] <= 0.1
+
+
+def test_concurrent_calls_do_not_queue_behind_each_other():
+    jobs = {name: _sleeper(0.2, name) for name in ("weather", "saints", "horoscope", "jokes")}
+    timeouts = dict.fromkeys(jobs, 0.35)
+    outcomes = []
+
+    def session():
+        outcomes.append(_collect(jobs, timeouts))
+
+    threads = [threading.Thread(target=session) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(outcomes) == 3
+    for results in outcomes:
+        assert all(error is None for _, error in results.values()), results
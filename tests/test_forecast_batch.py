@@ -0,0 +1,61 @@
+from urllib.parse import urlencode
+
+import numpy as np
+import pytest
+
+import openmeteo_replay
+import requete_page1 as rp
+
+from conftest import record_params
+
+CITIES = [(48.8566, 2.3522), (45.764, 4.8357), (43.2965, 5.3698), (50.6292, 3.0573), (44.8378, -0.5792)]
+
+
+@pytest.fixture
+def batch_replay(tmp_path, cache):
+    """Rejeu d'une fixture par ville (valeurs propres à chaque lieu) ; renvoie les paramètres reçus."""
+    openmeteo_replay.synthesize_fixtures(CITIES, str(tmp_path))
+    seen = record_params(openmeteo_replay.install_replay(str(tmp_path)))
+    yield seen
+    rp.close_http_clients()
+
+
+def _location(result):
+    location = result["current"]["location"]
+    return round(location["latitude"], 4), round(location["longitude"], 4)
+
+
+def test_batch_split_into_chunks_keeps_request_order(batch_replay):
+    coords = CITIES[3:] + CITIES[:3]
+
+    results = rp.get_weather_data_batch(coords, columnar=True, max_locations=2)
+
+    assert [len(params["latitude"][0].split(",")) for params in batch_replay] == [2, 2, 1]
+    assert [_location(result) for result in results] == coords
+    temperatures = [result["hourly"].column("temperature_2m") for result in results]
+    assert not np.array_equal(temperatures[0], temperatures[1])
+
+
+def test_batch_results_serve_later_calls_from_cache(batch_replay):
+    results = rp.get_weather_data_batch(CITIES, columnar=True, max_locations=2)
+    requests = len(batch_replay)
+
+    for (lat, lon), result in zip(CITIES, results):
+        single = rp.get_weather_data(lat, lon, columnar=True)
+        assert np.array_equal(single["hourly"].column("temperature_2m"), result["hourly"].column("temperature_2m"))
+    again = rp.get_weather_data_batch(CITIES[::-1], columnar=True, max_locations=2)
+    assert [_location(result) for result in again] == CITIES[::-1]
+    assert len(batch_replay) == requests  # appels simples et second lot servis par le cache
+
+
+def test_chunks_respect_url_length():
+    selected = rp._resolve_fields()
+    base_length = len(rp.OPENMETEO_URL) + len(urlencode(rp._weather_params("", "", selected), doseq=True)) + 1
+    coords = [(45.0 + i / 100, 4.0 + i / 100) for i in range(40)]
+
+    chunks = list(rp._chunk_coords(coords, selected, max_locations=100, max_url_length=base_length + 150))
+
+    assert len(chunks) > 1 and sum(chunks, []) == coords
+    for chunk in chunks:
+        params = rp._weather_params(",".join(str(lat) for lat, _ in chunk), ",".join(str(lon) for _, lon in chunk), selected)
+        assert len(rp.OPENMETEO_URL) + 1 + len(urlencode(params, doseq=True)) <= base_length + 150
@@ -0,0 +1,50 @@
+import pickle
+import time
+
+import requete_page1 as rp
+from forecast_cache import TieredCache
+
+from conftest import LATITUDE, LONGITUDE
+
+POINT = (LATITUDE, LONGITUDE)
+
+
+class _BrokenDeleteStore:
+    """Stockage L2 qui renvoie une entrée expirée mais ne sait pas la supprimer."""
+
+    def __init__(self):
+        self.deletes = 0
+
+    def get(self, key):
+        return pickle.dumps({"temperature_2m": 12.0}), time.time() - 60
+
+    def set(self, key, blob, expires_at):
+        pass
+
+    def delete(self, key):
+        self.deletes += 1
+        raise OSError("disque en lecture seule")
+
+
+def test_l2_delete_failure_is_a_miss():
+    store = _BrokenDeleteStore()
+    cache = TieredCache(store=store, graces={"current": 0})
+
+    assert cache.lookup("current", "paris") == (None, False)
+    assert store.deletes == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cached_forecast_owns_its_arrays(replay, cache):
+    replay()
+    selected = rp._resolve_fields()
+    response = rp._openmeteo_client().weather_api(rp.OPENMETEO_URL, params=rp._weather_params(*POINT, selected))[0]
+    parsed = rp._parse_weather_response(response, selected)
+    assert any(arr.base is not None for arr in parsed["hourly"].columns.values())  # vues sur la réponse
+
+    forecast = rp._fetch_forecast(cache, rp._location_key(*POINT), POINT, selected)
+    _, cached, _ = rp._lookup_forecast(cache, *POINT, selected)
+
+    for frame in (forecast["hourly"], forecast["daily"], cached["hourly"], cached["daily"]):
+        assert all(arr.base is None for arr in frame.columns.values())
+    assert cached["hourly"].column("temperature_2m") is forecast["hourly"].column("temperature_2m")
@@ -0,0 +1,17 @@
+import requete_page1 as rp
+
+from conftest import LATITUDE, LONGITUDE, record_params
+
+
+def test_miss_queries_requested_coordinates_and_neighbours_share_the_entry(replay, monkeypatch):
+    monkeypatch.setattr(rp, "COORD_GRID_RESOLUTION", 0.05)
+    seen = record_params(replay())
+
+    rp.get_weather_data(LATITUDE, LONGITUDE, columnar=True)
+    assert float(seen[0]["latitude"][0]) == LATITUDE
+    assert float(seen[0]["longitude"][0]) == LONGITUDE
+
+    # Point voisin dans la même cellule de la grille des clés : servi par le cache
+    assert rp._location_key(LATITUDE + 0.01, LONGITUDE) == rp._location_key(LATITUDE, LONGITUDE)
+    rp.get_weather_data(LATITUDE + 0.01, LONGITUDE, columnar=True)
+    assert len(seen) == 1
@@ -0,0 +1,50 @@
+import time
+
+import requete_page1 as rp
+
+from conftest import LATITUDE, LONGITUDE, record_params
+
+
+def _wait_generation(generation, timeout=10):
+    deadline = time.monotonic() + timeout
+    while rp.get_forecast_generation(LATITUDE, LONGITUDE) <= generation:
+        assert time.monotonic() < deadline, "rafraîchissement non terminé"
+        time.sleep(0.01)
+
+
+def test_expired_current_refreshes_only_current(replay, cache):
+    adapter = replay(None, {"current": rp.WEATHER_CURRENT})
+    seen = record_params(adapter)
+    cache.configure_ttl("current", 0)  # "current" expire aussitôt, mais reste dans sa fenêtre de grâce
+
+    first = rp.get_weather_data(LATITUDE, LONGITUDE, columnar=True)
+    generation = rp.get_forecast_generation(LATITUDE, LONGITUDE)
+    served = rp.get_weather_data(LATITUDE, LONGITUDE, columnar=True)
+    assert served["hourly"] is first["hourly"]
+    _wait_generation(generation)
+
+    # La requête de rafraîchissement ne demande que "current"
+    assert len(seen) == 2
+    assert "current" in seen[1] and "hourly" not in seen[1] and "daily" not in seen[1]
+
+    cache.configure_ttl("current", 600)
+    refreshed = rp.get_weather_data(LATITUDE, LONGITUDE, columnar=True)
+    assert refreshed["hourly"] is first["hourly"]
+    assert refreshed["daily"] is first["daily"]
+    assert refreshed["current"] != first["current"]  # fixture "current" seule : autres valeurs
+    assert len(seen) == 2
+
+
+def test_all_datasets_stale_triggers_full_refresh(replay, cache):
+    adapter = replay()
+    seen = record_params(adapter)
+    for dataset in rp.FORECAST_DATASETS:
+        cache.configure_ttl(dataset, 0)
+
+    rp.get_weather_data(LATITUDE, LONGITUDE, columnar=True)
+    generation = rp.get_forecast_generation(LATITUDE, LONGITUDE)
+    rp.get_weather_data(LATITUDE, LONGITUDE, columnar=True)
+    _wait_generation(generation)
+
+    assert len(seen) == 2
+    assert all(section in seen[1] for section in rp.FORECAST_DATASETS)
@@ -0,0 +1,108 @@
+import numpy as np
+
+from forecast_share import SharedForecastCache
+
+
+def _forecast(value=0.0, size=1000):
+    return {"current": {"temperature_2m": value}, "hourly": np.full(size, value), "daily": np.full(7, value)}
+
+
+class _Loader:
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.data
+
+
+def test_acquire_and_release_count_references():
+    shared = SharedForecastCache()
+    loader = _Loader(_forecast())
+
+    first = shared.acquire("paris", 1, loader)
+    second = shared.acquire("paris", 1, loader)
+    assert loader.calls == 1
+    assert first.data is second.data
+    assert shared.stats()["leases"] == 2 and shared.counters["hits"] == 1
+
+    first.release()
+    first.release()  # idempotent
+    assert shared.stats()["leases"] == 1
+    second.release()
+    stats = shared.stats()
+    assert stats["leases"] == 0 and stats["entries"] == 1  # gardée tant que le plafond le permet
+
+
+def test_lease_released_when_collected():
+    shared = SharedForecastCache()
+    lease = shared.acquire("paris", 1, _Loader(_forecast()))
+    assert shared.stats()["leases"] == 1
+    del lease
+    assert shared.stats()["leases"] == 0
+
+
+def test_eviction_only_when_unreferenced():
+    one_entry = 1000 * 8 + 7 * 8 + 200
+    shared = SharedForecastCache(max_bytes=one_entry)
+    paris = shared.acquire("paris", 1, _Loader(_forecast(1.0)))
+    london = shared.acquire("london", 1, _Loader(_forecast(2.0)))
+
+    # Plafond dépassé, mais les deux entrées sont tenues : aucune éviction
+    assert shared.stats()["entries"] == 2 and shared.counters["evictions"] == 0
+
+    paris.release()
+    assert shared.stats()["entries"] == 1 and shared.counters["evictions"] == 1
+    assert london.data["hourly"][0] == 2.0
+
+    loader = _Loader(_forecast(1.0))
+    shared.acquire("paris", 1, loader)
+    assert loader.calls == 1  # évincée : rechargée
+
+
+def test_new_generation_drops_older_ones():
+    shared = SharedForecastCache()
+    old = shared.acquire("paris", 1, _Loader(_forecast(1.0)))
+    new = shared.acquire("paris", 2, _Loader(_forecast(2.0)))
+
+    # L'ancienne version n'est plus accessible, mais reste en mémoire tant qu'elle est tenue
+    assert shared.stats()["entries"] == 2
+    assert old.data["hourly"][0] == 1.0
+    old.release()
+    assert shared.stats()["entries"] == 1
+
+    loader = _Loader(_forecast(1.0))
+    shared.acquire("paris", 1, loader)
+    assert loader.calls == 1  # version 1 détachée : plus servie depuis le registre
+    assert new.data["hourly"][0] == 2.0
+
+
+def test_same_forecast_under_newer_generation_is_shared():
+    shared = SharedForecastCache()
+    data = _forecast()
+    first = shared.acquire("paris", 1, _Loader(data))
+    second = shared.acquire("paris", 2, _Loader(dict(data)))
+
+    assert second.data is first.data
+    assert shared.counters["deduplicated"] == 1 and shared.stats()["entries"] == 1
+
+
+def test_release_during_acquire_scan():
+    shared = SharedForecastCache()
+    held = shared.acquire("paris", 1, _Loader(_forecast(1.0)))
+    shared.acquire("paris", 2, _Loader(_forecast(2.0))).release()
+    leases = [held]
+
+    class ReleasingForecast(dict):
+        """Libère un bail (comme le GC) pendant la recherche d'une prévision identique."""
+
+        def get(self, name, default=None):
+            if leases:
+                leases.pop().release()
+            return super().get(name, default)
+
+    lease = shared.acquire("paris", 3, _Loader(ReleasingForecast(_forecast(3.0))))
+
+    assert lease.data["hourly"][0] == 3.0
+    assert shared.stats()["entries"] == 1 and shared.stats()["leases"] == 1
@@ -0,0 +1,106 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import forecast_store
+import requete_page1 as rp
+from forecast_store import ForecastStore
+from weather_frame import WeatherFrame
+
+from conftest import LATITUDE, LONGITUDE
+
+POINT = (LATITUDE, LONGITUDE)
+KEY = rp._location_key(*POINT)
+RUN = datetime(2025, 11, 9, 6, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ForecastStore(str(tmp_path / "store"), rp.WEATHER_VARIABLES, rp.EPOCH_VARIABLES)
+
+
+@pytest.fixture
+def fetch(replay, cache):
+    """Prévision rejouée (jeu de variables `fields`, None = complet), sans passer par l'historique."""
+    def fetch(fields=None):
+        replay(fields)
+        return rp._fetch_forecast(cache, KEY, POINT, rp._resolve_fields(fields))
+    return fetch
+
+
+def _files(store, resolution):
+    base = os.path.join(store.path, f"resolution={resolution}")
+    return [os.path.join(root, name) for root, _, names in os.walk(base) for name in names]
+
+
+def test_append_then_read_back(store, fetch):
+    forecast = fetch()
+
+    written = store.append(KEY, forecast, RUN)
+
+    hourly, daily = forecast["hourly"], forecast["daily"]
+    assert written == len(hourly) + len(daily) + 1
+    df = store.query(KEY)
+    assert len(df) == len(hourly) and (df["run_time"] == RUN).all()
+    assert df["valid_time"].tolist() == list(hourly.time_index)
+    for name, values in hourly.columns.items():
+        assert np.array_equal(df[name].to_numpy(dtype="float32"), values, equal_nan=True)
+    sunrise = store.query(KEY, "daily", variables=["sunrise"])["sunrise"]
+    assert [int(ts.timestamp()) for ts in sunrise] == daily.column("sunrise").tolist()
+    current = store.query(KEY, "current")
+    assert current["temperature_2m"].tolist() == pytest.approx([forecast["current"]["temperature_2m"]])
+
+
+def test_schema_is_fixed_across_variable_sets(store, fetch):
+    store.append(KEY, fetch({"hourly": ["temperature_2m"]}), RUN)
+
+    schema = store._schemas["hourly"]
+    assert schema.names == ["run_time", "valid_time", *rp.WEATHER_HOURLY]
+    for path in _files(store, "hourly"):
+        written = pq.read_schema(path)  # Parquet n'a pas d'unité seconde : timestamps relus en ms
+        assert written.names == schema.names
+        assert all(written.field(name).type == pa.float32() for name in rp.WEATHER_HOURLY)
+    table = store._dataset("hourly").to_table()
+    assert table.schema.field("valid_time").type == pa.timestamp("s", tz="UTC")
+    assert store._schemas["daily"].field("sunset").type == pa.timestamp("s", tz="UTC")
+    df = store.query(KEY)
+    assert df["temperature_2m"].notna().all()
+    assert df["relative_humidity_2m"].isna().all()  # non demandée : null, colonne présente
+    with pytest.raises(ValueError):
+        store.query(KEY, variables=["inconnue"])
+
+
+def test_runs_appended_and_latest_deduplicated(store, fetch):
+    forecast = fetch()
+    hourly = forecast["hourly"]
+    later = dict(forecast, hourly=WeatherFrame({name: values + 1 for name, values in hourly.columns.items()},
+                                               hourly.start, hourly.end, hourly.interval))
+    store.append(KEY, forecast, RUN)
+    store.append(KEY, later, RUN + timedelta(hours=1))
+
+    assert len(_files(store, "hourly")) == 2  # rien n'est réécrit
+    assert [ts.to_pydatetime() for ts in store.runs(KEY)] == [RUN, RUN + timedelta(hours=1)]
+    assert len(store.query(KEY)) == 2 * len(hourly)
+    latest = store.query(KEY, variables=["temperature_2m"], latest=True)
+    assert len(latest) == len(hourly)
+    assert np.array_equal(latest["temperature_2m"].to_numpy(dtype="float32"), hourly.column("temperature_2m") + 1)
+    assert len(store.query(KEY, run_start=RUN + timedelta(minutes=30))) == len(hourly)
+    assert store.query("0.0|0.0").empty
+
+
+def test_fetch_archives_in_background(replay, cache, tmp_path):
+    forecast_store.configure_forecast_store(str(tmp_path / "archive"))
+    try:
+        replay()
+        rp.get_weather_data(*POINT)
+        deadline = time.monotonic() + 10
+        while not rp.query_forecast_history(*POINT).shape[0] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(rp.query_forecast_history(*POINT)) == len(rp.get_weather_data(*POINT, columnar=True)["hourly"])
+    finally:
+        forecast_store.configure_forecast_store(enabled=False)
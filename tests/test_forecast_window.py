@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+import pytest
+
+import openmeteo_replay
+import requete_page1 as rp
+from weather_frame import WeatherFrame
+
+from conftest import LATITUDE, LONGITUDE, record_params
+
+POINT = (LATITUDE, LONGITUDE)
+
+
+def _shifted(frame, seconds):
+    return WeatherFrame(frame.columns, frame.start + seconds, frame.end + seconds, frame.interval,
+                        frame.epoch_columns)
+
+
+@pytest.fixture
+def cached(replay, cache, tmp_path):
+    """Prévision complète en cache (graine 0), puis fixtures d'une autre graine installées."""
+    replay()
+    selected = rp._resolve_fields()
+    forecast = rp._fetch_forecast(cache, rp._location_key(*POINT), POINT, selected)
+    openmeteo_replay.synthesize_fixtures([POINT], str(tmp_path), seed=1)
+    adapter = openmeteo_replay.install_replay(str(tmp_path))
+    return forecast, selected, adapter
+
+
+def test_replay_honours_forecast_window(replay):
+    adapter = replay()
+    params = rp._weather_params(*POINT, rp._resolve_fields())
+    client = rp._openmeteo_client()
+    client.weather_api(rp.OPENMETEO_URL, params=params)
+    full_bytes = adapter.counters["bytes"]
+
+    response = client.weather_api(rp.OPENMETEO_URL, params={**params, "forecast_hours": 6, "past_hours": 0,
+                                                             "forecast_days": 2})[0]
+    assert response.Hourly().Time() == int(time.time()) // 3600 * 3600
+    assert response.Hourly().TimeEnd() - response.Hourly().Time() == 6 * 3600
+    assert response.Daily().TimeEnd() - response.Daily().Time() == 2 * 86400
+    assert adapter.counters["bytes"] - full_bytes < full_bytes / 4
+
+
+def test_window_merged_at_current_hour(cached, cache):
+    forecast, selected, adapter = cached
+    seen = record_params(adapter)
+
+    merged = rp._fetch_forecast_window(cache, rp._location_key(*POINT), POINT, forecast, selected, hours=6)
+
+    assert seen[0]["forecast_hours"] == ["6"] and seen[0]["past_hours"] == ["0"]
+    hourly = forecast["hourly"]
+    offset = (int(time.time()) // 3600 * 3600 - hourly.start) // 3600
+    assert len(merged["hourly"]) == len(hourly)
+    for name, values in merged["hourly"].columns.items():
+        original = hourly.column(name)
+        assert np.array_equal(values[:offset], original[:offset])
+        assert np.array_equal(values[offset + 6:], original[offset + 6:])
+        assert not np.array_equal(values[offset:offset + 6], original[offset:offset + 6])
+    days = int(seen[0]["forecast_days"][0])
+    assert np.array_equal(merged["daily"].column("temperature_2m_max")[days:],
+                          forecast["daily"].column("temperature_2m_max")[days:])
+
+
+def test_merge_ignores_window_rows_past_frame_end():
+    frame = WeatherFrame({"t": np.zeros(24)}, start=0, end=24 * 3600, interval=3600)
+    window = WeatherFrame({"t": np.ones(6)}, start=21 * 3600, end=27 * 3600, interval=3600)
+
+    merged = frame.merge(window)
+
+    assert len(merged) == 24
+    assert merged.column("t").tolist() == [0.0] * 21 + [1.0] * 3
+    assert frame.column("t").sum() == 0  # frame partagé intact
+    with pytest.raises(ValueError):
+        frame.merge(_shifted(window, 3 * 3600))  # fenêtre entièrement après la fin
+
+
+@pytest.mark.parametrize("shift", [-86400, 1800], ids=["jour-change", "non-aligne"])
+def test_full_reload_when_window_cannot_merge(cached, cache, shift):
+    forecast, selected, adapter = cached
+    seen = record_params(adapter)
+    stale = dict(forecast, hourly=_shifted(forecast["hourly"], shift))
+
+    reloaded = rp._fetch_forecast_window(cache, rp._location_key(*POINT), POINT, stale, selected, hours=6)
+
+    assert "forecast_hours" not in seen[-1]
+    assert reloaded["hourly"].start == forecast["hourly"].start
+    assert len(reloaded["hourly"]) == len(forecast["hourly"])
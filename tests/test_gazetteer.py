@@ -0,0 +1,45 @@
+import pytest
+
+from gazetteer import Gazetteer
+
+CITIES = """name\talternatenames\tlatitude\tlongitude\tcountry_code\tpopulation
+Paris\t\t48.8566\t2.3522\tFR\t2133111
+Paris\t\t48.8566\t2.3522\tFR\t2133111
+Saint-Denis\t\t48.9362\t2.3574\tFR\t113116
+Saint-Denis\tSaint-Denis de La Réunion\t-20.8823\t55.4504\tRE\t153810
+London\tLondres\t51.5074\t-0.1278\tGB\t8961989
+London\t\t42.9834\t-81.233\tCA\t383822
+Marseille\t\t43.2965\t5.3698\tFR\t870731
+"""
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = tmp_path / "cities.tsv"
+    path.write_text(CITIES, encoding="utf-8")
+    return Gazetteer(str(path))
+
+
+def test_homonym_in_default_country_wins(gazetteer):
+    assert gazetteer.lookup("saint denis")["country"] == "FR"
+    assert [city["country"] for city in gazetteer.homonyms("Saint-Denis")] == ["FR", "RE"]
+    assert gazetteer.lookup("Saint-Denis de la Réunion")["country"] == "RE"
+
+
+def test_homonyms_abroad_ranked_by_population(gazetteer):
+    assert [city["country"] for city in gazetteer.homonyms("London")] == ["GB", "CA"]
+    assert gazetteer.lookup("Londres")["country"] == "GB"
+
+
+def test_unambiguous_and_unknown_names(gazetteer):
+    assert len(gazetteer.homonyms("Paris")) == 1  # ligne en double : une seule ville
+    assert gazetteer.homonyms("Trifouilly") == []
+
+
+def test_remembered_city_reaches_built_suggest_index(gazetteer):
+    assert gazetteer.suggest("Trifouil") == []  # index de suggestions construit
+
+    gazetteer.remember("Trifouilly-les-Oies", {"name": "Trifouilly-les-Oies", "lat": 47.0, "lon": 2.0,
+                                               "country": "FR", "population": 0})
+
+    assert [city["name"] for city in gazetteer.suggest("Trifouil")] == ["Trifouilly-les-Oies"]
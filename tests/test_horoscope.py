@@ -0,0 +1,55 @@
+import pytest
+
+import requete_page1 as rp
+import resilience
+from prokerala_stub import ProkeralaStub
+
+
+@pytest.fixture
+def stub():
+    with ProkeralaStub() as stub:
+        yield stub
+
+
+@pytest.fixture
+def engine(stub, cache, monkeypatch):
+    resilience.configure_upstream("prokerala")  # disjoncteur neuf
+    engine = rp._HoroscopeEngine(base_url=stub.url, client_id="client", client_secret="secret")
+    monkeypatch.setattr(engine, "translate", lambda text: text)  # pas de traduction en ligne
+    monkeypatch.setattr(rp, "_horoscope_engine", engine)
+    return engine
+
+
+def test_token_reused_across_requests(engine, stub):
+    for sign in ("aries", "leo", "pisces"):
+        assert engine.fetch_sign(sign)["signe_demande"] == sign
+
+    assert stub.stats() == {"tokens": 1, "horoscopes": 3, "unauthorized": 0}
+    assert engine.tokens_issued == 1
+
+
+def test_token_renewed_once_on_401(engine, stub):
+    engine.fetch_sign("aries")
+    stub.expire_tokens()
+
+    assert engine.fetch_sign("leo")["sign_name"] == "Leo"
+    assert stub.stats() == {"tokens": 2, "horoscopes": 2, "unauthorized": 1}
+
+
+def test_twelve_signs_prefetched_once_per_day(engine, stub):
+    infos = [rp.get_horoscope_data(sign) for sign in rp.HOROSCOPE_SIGNS]
+
+    assert [info["signe_demande"] for info in infos] == list(rp.HOROSCOPE_SIGNS)
+    assert stub.stats() == {"tokens": 1, "horoscopes": 12, "unauthorized": 0}
+    rp.get_horoscope_data("virgo")
+    assert stub.stats()["horoscopes"] == 12
+
+
+@pytest.mark.parametrize("client_id, client_secret", [("", ""), ("client", "")])
+def test_missing_credentials_report_not_configured(stub, cache, monkeypatch, client_id, client_secret):
+    engine = rp._HoroscopeEngine(base_url=stub.url, client_id=client_id, client_secret=client_secret)
+    monkeypatch.setattr(rp, "_horoscope_engine", engine)
+
+    assert not rp.horoscope_configured()
+    assert rp.get_horoscope_data("leo") is None
+    assert stub.stats() == {"tokens": 0, "horoscopes": 0, "unauthorized": 0}
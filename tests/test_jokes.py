@@ -0,0 +1,39 @@
+import pytest
+
+import requete_page1 as rp
+
+
+def _joke(joke_id):
+    return {"id": joke_id, "type": "dev", "joke": f"q{joke_id}", "answer": f"a{joke_id}"}
+
+
+@pytest.fixture
+def direct_pool():
+    """Réserve vide (size=0) : chaque pop() passe par les requêtes directes, rejouées depuis `ids`."""
+    pool = rp._JokePool(size=0, low_water=0)
+    ids = []
+
+    async def fetch_one():
+        return _joke(ids.pop(0)) if ids else None
+
+    pool._fetch_one = fetch_one
+    return pool, ids
+
+
+def test_direct_fetch_skips_duplicates(direct_pool):
+    pool, ids = direct_pool
+    ids.extend([1, 1, 2])
+
+    assert pool.pop(timeout=2)["id"] == 1
+    assert pool.pop(timeout=2)["id"] == 2
+    assert pool.duplicates == 1
+
+
+def test_direct_fetch_falls_back_to_last_joke(direct_pool):
+    pool, ids = direct_pool
+    ids.extend([1] + [1] * (rp.JOKE_DIRECT_ATTEMPTS + 1))
+
+    assert pool.pop(timeout=2)["id"] == 1
+    assert pool.pop(timeout=2)["id"] == 1  # que des doublons : la dernière blague servie
+    assert pool.duplicates == rp.JOKE_DIRECT_ATTEMPTS
+    assert ids == [1]  # pas plus de JOKE_DIRECT_ATTEMPTS requêtes
@@ -0,0 +1,157 @@
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+import resilience
+from resilience import CircuitBreaker, GuardedAdapter, Upstream, UpstreamUnavailable, deadline
+
+
+# ------------------------
+# Disjoncteur
+# ------------------------
+def test_breaker_opens_after_failure_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opened == 1
+    assert not breaker.allow()
+    assert 0 < breaker.retry_after() <= 60
+
+
+def test_success_resets_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow()  # requête de test
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record_failure()  # test raté : réouverture
+    assert breaker.state == "open" and breaker.opened == 2
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow() and breaker.allow()
+
+
+def test_busy_rejection_releases_the_probe(monkeypatch):
+    monkeypatch.setattr(resilience, "UPSTREAM_QUEUE_TIMEOUT", 0.01)
+    upstream = Upstream("test", concurrency=1, timeout=1, breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=0))
+    upstream.breaker.record_failure()
+    upstream._slots.acquire()  # seule place occupée
+
+    with pytest.raises(UpstreamUnavailable) as excinfo:
+        with upstream.call():
+            pass
+    assert excinfo.value.reason == "busy"
+    assert upstream.breaker.state == "half_open"
+
+    # La requête de test refusée n'a pas consommé le droit de tester
+    upstream._slots.release()
+    with upstream.call():
+        pass
+    assert upstream.breaker.state == "closed"
+
+
+# ------------------------
+# GuardedAdapter : nouvelles tentatives
+# ------------------------
+@pytest.fixture
+def guarded(monkeypatch):
+    """GuardedAdapter sur une API amont de test ; transport simulé, attentes enregistrées."""
+    resilience.configure_upstream("test", concurrency=2, timeout=1, failure_threshold=100, recovery_timeout=60)
+    sends, sleeps = [], []
+
+    def fake_send(self, request, **kwargs):
+        sends.append(request.url)
+        response = requests.Response()
+        response.status_code = 503
+        response._content = b""
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", fake_send)
+    monkeypatch.setattr(resilience.time, "sleep", sleeps.append)
+    adapter = GuardedAdapter("test", retry=Retry(total=3, backoff_factor=1, status_forcelist=[503]))
+    request = requests.Request("GET", "http://amont.test/").prepare()
+    return adapter, request, sends, sleeps
+
+
+def test_retries_follow_backoff_without_deadline(guarded):
+    adapter, request, sends, sleeps = guarded
+
+    assert adapter.send(request).status_code == 503
+    assert len(sends) == 4
+    assert sleeps == [1, 2, 4]
+
+
+def test_retries_stop_when_deadline_leaves_no_time_to_back_off(guarded):
+    adapter, request, sends, sleeps = guarded
+
+    with deadline(3.5):
+        assert adapter.send(request).status_code == 503
+    assert sleeps == [1, 2]  # l'attente suivante (4 s) dépasserait l'échéance
+    assert len(sends) == 3
+
+    sends.clear()
+    sleeps.clear()
+    with deadline(0.5):
+        adapter.send(request)
+    assert len(sends) == 1 and sleeps == []
+
+
+def test_breaker_counts_one_failure_per_call(guarded):
+    adapter, request, sends, sleeps = guarded
+    upstream = resilience.configure_upstream("test", failure_threshold=2, recovery_timeout=60)
+
+    assert adapter.send(request).status_code == 503
+    assert len(sends) == 4
+    assert upstream.breaker.failures == 1 and upstream.breaker.state == "closed"
+    assert upstream.stats()["failures"] == 1
+
+    adapter.send(request)
+    assert upstream.breaker.state == "open"
+
+
+def test_retried_attempt_does_not_spend_the_probe(guarded, monkeypatch):
+    adapter, request, sends, sleeps = guarded
+    upstream = resilience.configure_upstream("test", failure_threshold=1, recovery_timeout=0)
+    upstream.breaker.record_failure()
+    statuses = [503, 200]
+
+    def recovering(self, request, **kwargs):
+        sends.append(request.url)
+        response = requests.Response()
+        response.status_code = statuses.pop(0)
+        response._content = b""
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", recovering)
+    assert adapter.send(request).status_code == 200
+    assert len(sends) == 2 and upstream.breaker.state == "closed"
+
+
+def test_retries_stop_when_breaker_opens(guarded, monkeypatch):
+    adapter, request, sends, sleeps = guarded
+    upstream = resilience.configure_upstream("test", failure_threshold=1, recovery_timeout=60)
+
+    def refused(self, request, **kwargs):
+        sends.append(request.url)
+        upstream.breaker.record_failure()  # autre appel en échec pendant celui-ci
+        raise requests.exceptions.ConnectionError("refusé")
+
+    monkeypatch.setattr(HTTPAdapter, "send", refused)
+    with pytest.raises(UpstreamUnavailable) as excinfo:
+        adapter.send(request)
+    assert excinfo.value.reason == "circuit_open"
+    assert len(sends) == 1
@@ -0,0 +1,90 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import requete_page1 as rp
+from resilience import deadline
+
+
+def _leader_blocked(flight, key, release, result=None, error=None):
+    """Lance un premier appel qui reste bloqué jusqu'à `release` ; renvoie son Future."""
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        if error is not None:
+            raise error
+        return result
+
+    future = ThreadPoolExecutor(max_workers=1).submit(flight.do, key, fn)
+    assert started.wait(5)
+    return future
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = rp._SingleFlight()
+    release = threading.Event()
+    calls = []
+    leader = _leader_blocked(flight, "k", release, result="shared")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        waiters = [pool.submit(flight.do, "k", lambda: calls.append(1)) for _ in range(8)]
+        while flight.stats()["coalesced"] < 8:
+            time.sleep(0.001)
+        release.set()
+        results = [w.result(5) for w in waiters]
+
+    assert leader.result(5) == "shared"
+    assert results == ["shared"] * 8
+    assert calls == []
+    assert flight.stats() == {"coalesced": 8, "in_flight": 0}
+
+
+def test_exception_is_shared_and_key_released_after_failure():
+    flight = rp._SingleFlight()
+    release = threading.Event()
+    leader = _leader_blocked(flight, "k", release, error=ValueError("amont"))
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        waiter = pool.submit(flight.do, "k", lambda: "jamais")
+        while flight.stats()["coalesced"] < 1:
+            time.sleep(0.001)
+        release.set()
+        with pytest.raises(ValueError, match="amont"):
+            waiter.result(5)
+    with pytest.raises(ValueError, match="amont"):
+        leader.result(5)
+
+    # Clé libérée : l'appel suivant exécute de nouveau la fonction
+    assert flight.stats()["in_flight"] == 0
+    assert flight.do("k", lambda: "nouvel essai") == "nouvel essai"
+
+
+def test_waiter_gives_up_at_its_deadline():
+    flight = rp._SingleFlight()
+    release = threading.Event()
+    leader = _leader_blocked(flight, "k", release, result="tardif")
+
+    started = time.monotonic()
+    with deadline(0.1), pytest.raises(TimeoutError):
+        flight.do("k", lambda: "jamais")
+    assert time.monotonic() - started < 1
+
+    release.set()
+    assert leader.result(5) == "tardif"
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_waiter_without_deadline_uses_default_timeout(monkeypatch):
+    monkeypatch.setattr(rp, "SINGLE_FLIGHT_WAIT_TIMEOUT", 0.1)
+    flight = rp._SingleFlight()
+    release = threading.Event()
+    leader = _leader_blocked(flight, "k", release)
+
+    with pytest.raises(TimeoutError):
+        flight.do("k", lambda: "jamais")
+    release.set()
+    leader.result(5)
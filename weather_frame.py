@@ -0,0 +1,236 @@
+"""
+Représentation colonnaire des séries météo (horaires / journalières).
+
+Un WeatherFrame garde un tableau NumPy typé par variable (float32 tel que fourni
+par le SDK, int64 epoch pour sunrise/sunset) et un index temporel calculé à la
+demande, au lieu d'une liste de dictionnaires par ligne. Les index sont partagés
+entre tous les frames de même axe (tranches, projections, lieux d'un même fuseau).
+L'ancien format « records » reste disponible via WeatherRecords, un adaptateur
+paresseux qui ne construit les dictionnaires qu'au moment où on les lit.
+"""
+
+from collections.abc import Sequence
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+@lru_cache(maxsize=256)
+def shared_time_index(start, periods, interval):
+    """
+    Index temporel UTC (start, periods, interval) ; un seul objet par axe, réutilisé
+    par tous les frames qui le demandent (un DatetimeIndex est immuable).
+    """
+    return pd.date_range(
+        start=pd.to_datetime(start, unit="s", utc=True),
+        periods=periods,
+        freq=pd.Timedelta(seconds=interval),
+    )
+
+
+class WeatherFrame:
+    """
+    Série météo colonnaire : {nom_variable: np.ndarray} + axe temporel régulier.
+
+    Parameters:
+    columns (dict): Tableaux NumPy de même longueur, indexés par nom de variable
+    start (int): Début de la série (epoch en secondes, UTC)
+    end (int): Fin (exclue) de la série (epoch en secondes, UTC)
+    interval (int): Pas de temps en secondes
+    epoch_columns (iterable): Colonnes contenant des timestamps epoch (ex: sunrise)
+
+    Le frame se comporte aussi comme une liste de lignes pour les anciens appels :
+    frame[0] renvoie un dict, frame[:24] un frame tronqué (vues, sans copie)
+    et l'itération produit les dictionnaires du format historique.
+    """
+
+    def __init__(self, columns, start, end, interval, epoch_columns=()):
+        self.columns = {}
+        for name, values in columns.items():
+            arr = np.asarray(values)
+            arr.flags.writeable = False
+            self.columns[name] = arr
+        self.start = int(start)
+        self.end = int(end)
+        self.interval = int(interval)
+        self.epoch_columns = frozenset(epoch_columns)
+        self._time_index = None
+
+    # --- Accès colonnaire ---
+    @property
+    def time_index(self):
+        """Index temporel UTC, calculé une seule fois par axe (cf. shared_time_index)."""
+        if self._time_index is None:
+            self._time_index = shared_time_index(self.start, len(self), self.interval)
+        return self._time_index
+
+    def column(self, name, default=None):
+        """Renvoie le tableau NumPy d'une variable (ou `default` si absente)."""
+        return self.columns.get(name, default)
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self.columns.values())
+
+    def to_pandas(self):
+        """
+        Vue DataFrame (colonne `date` + variables) construite sans copier les tableaux.
+        Les colonnes epoch sont exposées en datetime64[s] par simple réinterprétation.
+        """
+        data = {"date": self.time_index}
+        for name, arr in self.columns.items():
+            data[name] = arr.view("datetime64[s]") if name in self.epoch_columns else arr
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self):
+        """Vue pyarrow.Table (zéro copie pour les colonnes numériques)."""
+        import pyarrow as pa
+
+        arrays = {"date": pa.array(self.time_index)}
+        for name, arr in self.columns.items():
+            if name in self.epoch_columns:
+                arrays[name] = pa.array(arr.view("datetime64[s]"))
+            else:
+                arrays[name] = pa.array(arr)
+        return pa.table(arrays)
+
+    def records(self):
+        """Adaptateur paresseux vers l'ancien format liste de dictionnaires."""
+        return WeatherRecords(self)
+
+    # --- Compatibilité « liste de lignes » ---
+    def __len__(self):
+        if not self.columns:
+            return max(0, (self.end - self.start) // self.interval) if self.interval else 0
+        return len(next(iter(self.columns.values())))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, slice):
+            return self.slice(key)
+        return self.row(key)
+
+    def select(self, names):
+        """Sous-frame limité à certaines variables (mêmes tableaux, même axe temporel)."""
+        frame = WeatherFrame(
+            {name: self.columns[name] for name in names if name in self.columns},
+            start=self.start,
+            end=self.end,
+            interval=self.interval,
+            epoch_columns=self.epoch_columns.intersection(names),
+        )
+        frame._time_index = self._time_index
+        return frame
+
+    def merge(self, window):
+        """
+        Nouveau frame où les lignes couvertes par `window` (même pas de temps, mêmes
+        variables) sont remplacées ; les autres lignes sont reprises telles quelles
+        et les lignes de la fenêtre au-delà de la fin du frame sont ignorées.
+        Le frame d'origine, partagé en lecture seule, n'est pas modifié.
+        """
+        if len(window) == 0 or not self.columns:
+            return self
+        if window.interval != self.interval or (window.start - self.start) % self.interval:
+            raise ValueError("Fenêtre non alignée sur le pas de temps du frame")
+        offset = (window.start - self.start) // self.interval
+        if not 0 <= offset < len(self):
+            raise ValueError("Fenêtre en dehors de la période du frame")
+        stop = min(len(self), offset + len(window))
+
+        columns = {}
+        for name, arr in self.columns.items():
+            values = window.column(name)
+            if values is None:
+                raise ValueError(f"Variable absente de la fenêtre : {name}")
+            merged = arr.copy()
+            merged[offset:stop] = values[:stop - offset]
+            columns[name] = merged
+        frame = WeatherFrame(columns, self.start, self.end, self.interval, self.epoch_columns)
+        frame._time_index = self._time_index
+        return frame
+
+    def detached(self):
+        """
+        Frame dont les tableaux possèdent leurs données : les vues (sur le buffer d'une
+        réponse FlatBuffers, tranches d'un autre frame) sont copiées. Un frame gardé
+        longtemps (cache) ne retient ainsi pas tout le buffer dont il n'utilise qu'une partie.
+        """
+        if all(arr.base is None for arr in self.columns.values()):
+            return self
+        frame = WeatherFrame(
+            {name: arr if arr.base is None else arr.copy() for name, arr in self.columns.items()},
+            start=self.start,
+            end=self.end,
+            interval=self.interval,
+            epoch_columns=self.epoch_columns,
+        )
+        frame._time_index = self._time_index
+        return frame
+
+    def slice(self, key):
+        """Sous-frame contigu ; les tableaux sont des vues du frame d'origine."""
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            raise ValueError("WeatherFrame ne supporte que les tranches contiguës")
+        stop = max(start, stop)
+        return WeatherFrame(
+            {name: arr[start:stop] for name, arr in self.columns.items()},
+            start=self.start + start * self.interval,
+            end=self.start + stop * self.interval,
+            interval=self.interval,
+            epoch_columns=self.epoch_columns,
+        )
+
+    def row(self, i):
+        """Ligne `i` au format historique (date Timestamp, floats Python, heures formatées)."""
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("WeatherFrame index out of range")
+        record = {"date": self.time_index[i]}
+        for name, arr in self.columns.items():
+            if name in self.epoch_columns:
+                record[name] = pd.to_datetime(int(arr[i]), unit="s").strftime("%Y-%m-%d %H:%M:%S")
+            else:
+                record[name] = float(arr[i])
+        return record
+
+    def __repr__(self):
+        return f"WeatherFrame({len(self)} lignes, {len(self.columns)} variables)"
+
+
+class WeatherRecords(Sequence):
+    """
+    Séquence paresseuse de dictionnaires au format historique de get_weather_data.
+    Les lignes ne sont construites qu'à la lecture ; `frame` donne accès aux colonnes.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return WeatherRecords(self.frame.slice(key))
+        return self.frame.row(key)
+
+    def __iter__(self):
+        return iter(self.frame)
+
+    def __eq__(self, other):
+        if isinstance(other, WeatherRecords):
+            other = list(other)
+        return list(self) == other
+
+    def __repr__(self):
+        return f"WeatherRecords({len(self)} lignes)"
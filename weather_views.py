@@ -0,0 +1,377 @@
+"""
+Vues préparées des prévisions pour les onglets de la page de données.
+
+Une prévision (format get_weather_data(columnar=True)) est convertie une seule fois
+par version en une PreparedView, lue telle quelle par tous les onglets :
+- hourly  : 24 h typées (float64), dates dans le fuseau du lieu, libellés « Heure »
+            (%Hh) et « Horodatage » (%d-%m %Hh), colonnes dérivées (Temp, Proba, UV…) ;
+- table   : les mêmes 24 h sous les noms affichés (tableau complet, graphiques Altair) ;
+- daily   : jours localisés avec libellés (Jour, Lever, Coucher, durées, emoji météo) ;
+- forecast: tableau / graphique des prévisions 7 jours (noms de colonnes affichés) ;
+- heatmap : pivot température jours x heures sur 7 jours ;
+- metrics : indicateurs dérivés (moyennes, extrêmes, cumuls, alertes, jour/nuit) ;
+- digest  : empreinte du contenu de la prévision, version des graphiques en cache.
+
+Les vues sont mémorisées sur l'entrée partagée de la prévision (ForecastLease.derived,
+cf. forecast_share.py) : un rerun, ou une autre session sur la même version, ne refait
+aucun prétraitement. Les onglets ne doivent pas les modifier.
+"""
+
+import hashlib
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+HOURLY_VIEW_HOURS = 24
+WEEK_VIEW_HOURS = 168
+RAIN_THRESHOLD = 50  # probabilité (%) à partir de laquelle une heure est « pluvieuse »
+HIGH_UV_THRESHOLD = 6
+STRONG_WIND_THRESHOLD = 40  # km/h
+STORM_CODES = (95, 96, 99)
+
+JOURS_FR = ["Lun", "Mar", "Mer", "Jeu", "Ven", "Sam", "Dim"]
+JOURS_FR_LONGS = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+
+# Colonnes horaires affichées : nom de la variable -> nom dans la table
+TABLE_COLUMNS = {
+    "temperature_2m": "Température (°C)",
+    "apparent_temperature": "Ressenti (°C)",
+    "precipitation_probability": "Pluie (%)",
+    "wind_speed_10m": "Vent (km/h)",
+    "wind_direction_10m": "Vent (°)",
+    "relative_humidity_2m": "Humidité (%)",
+    "cloud_cover": "Nuages (%)",
+    "visibility": "Visibilité (km)",
+    "uv_index": "UV",
+}
+# Format d'affichage (st.column_config.NumberColumn) : les valeurs restent non arrondies
+TABLE_FORMATS = {
+    "Température (°C)": "%.1f",
+    "Ressenti (°C)": "%.1f",
+    "Pluie (%)": "%.0f",
+    "Vent (km/h)": "%.1f",
+    "Vent (°)": "%.0f",
+    "Humidité (%)": "%.0f",
+    "Nuages (%)": "%.0f",
+    "UV": "%.0f",
+}
+
+# Colonnes journalières affichées dans les prévisions 7 jours
+FORECAST_COLUMNS = {
+    "temperature_2m_max": "Max (°C)",
+    "temperature_2m_min": "Min (°C)",
+    "precipitation_sum": "Pluie (mm)",
+    "precipitation_probability_max": "Proba (%)",
+    "wind_speed_10m_max": "Vent (km/h)",
+    "uv_index_max": "UV Max",
+    "apparent_temperature_max": "Ressenti Max (°C)",
+}
+
+
+# ---------- Libellés ----------
+def deg_to_cardinal(deg):
+    try:
+        d = float(deg) % 360
+    except Exception:
+        return None
+    dirs = ["N","NNE","NE","ENE","E","ESE","SE","SSE",
+            "S","SSW","SW","WSW","W","WNW","NW","NNW"]
+    idx = int((d + 11.25) // 22.5) % 16
+    return dirs[idx]
+
+def sec_to_hm(sec):
+    try:
+        s = int(round(float(sec)))
+        h, r = divmod(s, 3600)
+        m = r // 60
+        return f"{h}h{m:02d}"
+    except Exception:
+        return "—"
+
+def weather_emoji(code):
+    try:
+        c = int(code)
+    except Exception:
+        return "🤷"
+
+    if c == 0: return "☀️"             # Ciel dégagé
+    if c in [1, 2, 3]: return "⛅"     # Partiellement nuageux
+    if c in [45, 48]: return "🌫️"     # Brouillard
+    if c in [51, 53, 55]: return "🌦️" # Bruine
+    if c in [61, 63, 65]: return "🌧️" # Pluie
+    if c in [71, 73, 75]: return "❄️" # Neige
+    if c in [80, 81, 82]: return "🌦️" # Averses
+    if c in [95, 96, 99]: return "⛈️" # Orage
+    return "🤷"
+
+
+# ---------- Préparation ----------
+def forecast_timezone(forecast):
+    """
+    Fuseau horaire du lieu (timezone=auto côté Open-Meteo), "UTC" s'il est inconnu.
+    Le SDK renvoie le nom en bytes : il est stocké sous la forme "b'Europe/Paris'".
+    """
+    location = (forecast.get("current") or {}).get("location") or {}
+    name = location.get("timezone") or "UTC"
+    if isinstance(name, bytes):
+        name = name.decode("utf-8", "replace")
+    if name[:2] in ("b'", 'b"') and name[-1:] == name[1]:
+        name = name[2:-1]
+    try:
+        pd.Timestamp(0, tz=name)
+    except Exception:
+        return "UTC"
+    return name
+
+def _columns(series, tz, limit=None):
+    """
+    (dates locales, {variable: tableau float64}) d'un WeatherFrame, sans passer par un
+    DataFrame intermédiaire, ou d'une liste de dictionnaires (ancien format).
+    Les colonnes epoch (sunrise, sunset) sont renvoyées en dates locales.
+    """
+    frame = getattr(series, "frame", series)
+    if limit is not None and series is not None:
+        frame = frame[:limit]
+    if hasattr(frame, "time_index"):
+        dates = frame.time_index
+        raw = {name: (pd.to_datetime(arr, unit="s", utc=True) if name in frame.epoch_columns else arr)
+               for name, arr in frame.columns.items()}
+    else:
+        df = pd.DataFrame(list(frame or []))
+        if "date" not in df:
+            return None, {}
+        dates = pd.DatetimeIndex(pd.to_datetime(df.pop("date"), errors="coerce", utc=True))
+        raw = {name: (pd.to_datetime(values, errors="coerce", utc=True) if name in ("sunrise", "sunset") else values)
+               for name, values in df.items()}
+
+    columns = {}
+    for name, values in raw.items():
+        if isinstance(values, (pd.DatetimeIndex, pd.Series)) and pd.api.types.is_datetime64_any_dtype(values):
+            columns[name] = pd.DatetimeIndex(values).tz_convert(tz)
+        elif getattr(values, "dtype", None) is not None and values.dtype.kind in "fiu":
+            columns[name] = np.asarray(values, dtype="float64")
+        else:
+            columns[name] = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64")
+    return dates.tz_convert(tz), columns
+
+def _digest(tz, *series):
+    """Empreinte du contenu d'une prévision (fuseau, dates et colonnes de chaque série)."""
+    digest = hashlib.blake2b(tz.encode(), digest_size=16)
+    for dates, columns in series:
+        if dates is None:
+            digest.update(b"-")
+            continue
+        digest.update(dates.asi8.tobytes())
+        for name, values in columns.items():
+            digest.update(name.encode())
+            digest.update(values.asi8.tobytes() if isinstance(values, pd.DatetimeIndex) else values.tobytes())
+    return digest.hexdigest()
+
+def _hhmm(dates):
+    return [f"{t.hour:02d}:{t.minute:02d}" if not pd.isna(t) else "—" for t in dates]
+
+def _hourly_frame(dates, columns, hours):
+    dates = dates[:hours]
+    data = {"dt": dates}
+    data.update((name, values[:hours]) for name, values in columns.items())
+    # Libellés formatés à partir des champs entiers (bien plus rapide que strftime sur des dates localisées)
+    data["Heure"] = [f"{h:02d}h" for h in dates.hour]
+    data["Horodatage"] = [f"{d:02d}-{m:02d} {h:02d}h" for d, m, h in zip(dates.day, dates.month, dates.hour)]
+    for alias, source in (("Temp", "temperature_2m"), ("Ressenti", "apparent_temperature"),
+                          ("Proba", "precipitation_probability"), ("Humidité", "relative_humidity_2m"),
+                          ("UV", "uv_index"), ("code", "weather_code")):
+        if source in columns:
+            data[alias] = data[source]
+    return pd.DataFrame(data)
+
+def _hourly_table(hourly):
+    data = {"Heure": hourly["Horodatage"].to_numpy()}
+    for source, target in TABLE_COLUMNS.items():
+        if source not in hourly:
+            continue
+        values = hourly[source].to_numpy()
+        data[target] = values / 1000.0 if source == "visibility" else values
+        if source == "wind_direction_10m":
+            data["Vent (direction)"] = [deg_to_cardinal(round(d)) if d == d else None for d in values]
+    return pd.DataFrame(data)
+
+def _daily_frame(dates, columns):
+    data = {"dt": dates}
+    data.update(columns)
+    weekdays, days = dates.dayofweek, dates.day
+    data["NomJour"] = [JOURS_FR[w] for w in weekdays]
+    data["Jour"] = [f"{JOURS_FR[w]} {d:02d}" for w, d in zip(weekdays, days)]
+    data["JourLong"] = [f"{JOURS_FR_LONGS[w]} {d:02d}" for w, d in zip(weekdays, days)]
+    for source, label in (("sunrise", "Lever"), ("sunset", "Coucher")):
+        if source in columns:
+            data[label] = _hhmm(columns[source])
+    for source, label in (("daylight_duration", "Durée jour"), ("sunshine_duration", "Ensoleillement")):
+        if source in columns:
+            data[label] = [sec_to_hm(v) for v in columns[source]]
+    if "weather_code" in columns:
+        data["Météo"] = [weather_emoji(v) if v == v else "🤷" for v in columns["weather_code"]]
+    return pd.DataFrame(data)
+
+def _forecast_table(daily):
+    columns = ["Jour", "Météo", *FORECAST_COLUMNS, "Lever", "Coucher"]
+    return daily[[c for c in columns if c in daily]].rename(columns=FORECAST_COLUMNS)
+
+def _heatmap(dates, columns):
+    """Pivot température moyenne jours x heures locales (24 colonnes, jours dans l'ordre)."""
+    temps = columns.get("temperature_2m")
+    if temps is None or len(dates) == 0:
+        return pd.DataFrame()
+    dates, temps = dates[:WEEK_VIEW_HOURS], temps[:WEEK_VIEW_HOURS]
+    days, first = np.unique(dates.normalize().asi8, return_index=True)
+    rows = np.searchsorted(days, dates.normalize().asi8)
+    valid = ~np.isnan(temps)
+    # Moyenne par case : une heure peut apparaître deux fois au changement d'heure
+    sums = np.zeros((len(days), 24))
+    counts = np.zeros((len(days), 24))
+    np.add.at(sums, (rows[valid], dates.hour[valid]), temps[valid])
+    np.add.at(counts, (rows[valid], dates.hour[valid]), 1)
+    with np.errstate(invalid="ignore"):
+        grid = sums / counts
+    labels = [f"{JOURS_FR[dates[i].dayofweek]} {dates[i].day:02d}" for i in first]
+    return pd.DataFrame(grid, index=pd.Index(labels, name="Jour"), columns=pd.RangeIndex(24, name="Heure"))
+
+def _values(df, column):
+    return df[column].to_numpy(dtype="float64") if column in df else None
+
+def _mean(values):
+    return float(np.nanmean(values)) if values is not None and not np.isnan(values).all() else None
+
+def _extreme(labels, values, largest=True):
+    """(libellé, valeur) du maximum (ou minimum) d'une série."""
+    if values is None or np.isnan(values).all():
+        return None
+    i = int(np.nanargmax(values) if largest else np.nanargmin(values))
+    return labels[i], float(values[i])
+
+def _span(labels, mask):
+    """(premier, dernier) libellé où le masque est vrai, None sinon."""
+    idx = np.flatnonzero(mask)
+    return (labels[idx[0]], labels[idx[-1]]) if len(idx) else None
+
+def _temperature_summary(values):
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+    return MappingProxyType({"mean": float(values.mean()), "max": float(values.max()), "min": float(values.min())})
+
+def _metrics(hourly, daily):
+    metrics = {}
+
+    # --- Semaine ---
+    days = daily["JourLong"].tolist() if "JourLong" in daily else []
+    t_max, t_min = _values(daily, "temperature_2m_max"), _values(daily, "temperature_2m_min")
+    wind, precip = _values(daily, "wind_speed_10m_max"), _values(daily, "precipitation_sum")
+    if t_max is not None and t_min is not None:
+        metrics["avg_temp"] = float(np.nanmean(t_max) + np.nanmean(t_min)) / 2
+    metrics["avg_wind"] = _mean(wind)
+    metrics["avg_uv"] = _mean(_values(daily, "uv_index_max"))
+    metrics["hottest"] = _extreme(days, t_max)
+    metrics["coldest"] = _extreme(days, t_min, largest=False)
+    metrics["windiest"] = _extreme(days, wind)
+    metrics["rainiest"] = _extreme(days, precip)
+    if precip is not None:
+        metrics["precip_24h"] = float(precip[0]) if len(precip) > 0 else None
+        metrics["precip_48h"] = float(np.nansum(precip[:2])) if len(precip) >= 2 else None
+        metrics["precip_7d"] = float(np.nansum(precip))
+    if len(daily) > 0:
+        metrics["sunrise_today"] = daily["sunrise"].iloc[0] if "sunrise" in daily else None
+        metrics["sunset_today"] = daily["sunset"].iloc[0] if "sunset" in daily else None
+
+    # --- 24 h ---
+    hours = hourly["Heure"].tolist() if "Heure" in hourly else []
+    stamps = hourly["Horodatage"].tolist() if "Horodatage" in hourly else []
+    proba, uv, temp = _values(hourly, "Proba"), _values(hourly, "UV"), _values(hourly, "Temp")
+    if proba is not None:
+        rainy = proba >= RAIN_THRESHOLD
+        first = np.flatnonzero(rainy)
+        metrics["next_rain"] = (stamps[first[0]], float(proba[first[0]])) if len(first) else None
+        metrics["rain_window"] = _span(hours, rainy)
+        metrics["rain_prob_max"] = float(np.nanmax(proba)) if not np.isnan(proba).all() else 0.0
+    if uv is not None and not np.isnan(uv).all():
+        peak = int(np.nanargmax(uv))
+        metrics["uv_peak"] = (float(uv[peak]), stamps[peak])
+        metrics["uv_risk_hours"] = _span(hours, uv >= HIGH_UV_THRESHOLD)
+    if "wind_speed_10m" in hourly:
+        metrics["strong_wind_hours"] = int((_values(hourly, "wind_speed_10m") >= STRONG_WIND_THRESHOLD).sum())
+    if "code" in hourly:
+        metrics["storm_hours"] = tuple(hours[i] for i in np.flatnonzero(np.isin(_values(hourly, "code"), STORM_CODES)))
+    metrics["avg_temp_24h"] = _mean(temp)
+
+    # --- Jour / nuit (is_day, ou 6h-20h à défaut) ---
+    if temp is not None:
+        if "is_day" in hourly:
+            is_day = _values(hourly, "is_day")
+            day_mask, night_mask = is_day == 1, is_day == 0
+        else:
+            hour = hourly["dt"].dt.hour.to_numpy()
+            day_mask = (hour >= 6) & (hour < 20)
+            night_mask = ~day_mask
+        metrics["day"] = _temperature_summary(temp[day_mask])
+        metrics["night"] = _temperature_summary(temp[night_mask])
+        if metrics["day"] and metrics["night"]:
+            metrics["amplitude"] = metrics["day"]["mean"] - metrics["night"]["mean"]
+    return MappingProxyType(metrics)
+
+
+class PreparedView:
+    """
+    Prévision préparée pour l'affichage (cf. docstring du module) ; à ne pas modifier,
+    elle est partagée entre les reruns et les sessions qui lisent la même version.
+    """
+
+    __slots__ = ("timezone", "hourly", "table", "daily", "forecast", "heatmap", "metrics", "digest")
+
+    def __init__(self, timezone, hourly, table, daily, forecast, heatmap, metrics, digest):
+        self.timezone = timezone
+        self.hourly = hourly
+        self.table = table
+        self.daily = daily
+        self.forecast = forecast
+        self.heatmap = heatmap
+        self.metrics = metrics
+        self.digest = digest  # version de contenu (clé du cache de graphiques, cf. chart_cache.py)
+
+    @property
+    def nbytes(self):
+        frames = (self.hourly, self.table, self.daily, self.forecast, self.heatmap)
+        return int(sum(frame.memory_usage(deep=True).sum() for frame in frames))
+
+    def __repr__(self):
+        return f"PreparedView({len(self.hourly)} h, {len(self.daily)} jours, {self.timezone})"
+
+
+def prepare_view(forecast):
+    """
+    Construit la vue préparée d'une prévision.
+
+    Parameters:
+    forecast (dict): Prévision au format get_weather_data(columnar=True) (ou liste de dictionnaires)
+
+    Returns:
+    PreparedView: Frames et indicateurs prêts à afficher
+    """
+    tz = forecast_timezone(forecast)
+    hourly_dates, hourly_columns = _columns(forecast.get("hourly"), tz, WEEK_VIEW_HOURS)
+    daily_dates, daily_columns = _columns(forecast.get("daily"), tz)
+    hourly = _hourly_frame(hourly_dates, hourly_columns, HOURLY_VIEW_HOURS) if hourly_dates is not None else pd.DataFrame()
+    daily = _daily_frame(daily_dates, daily_columns) if daily_dates is not None else pd.DataFrame()
+    return PreparedView(
+        timezone=tz,
+        hourly=hourly,
+        table=_hourly_table(hourly) if not hourly.empty else pd.DataFrame(),
+        daily=daily,
+        forecast=_forecast_table(daily) if not daily.empty else pd.DataFrame(),
+        heatmap=_heatmap(hourly_dates, hourly_columns) if hourly_dates is not None else pd.DataFrame(),
+        metrics=_metrics(hourly, daily),
+        digest=_digest(tz, (hourly_dates, hourly_columns), (daily_dates, daily_columns)),
+    )
+
+def get_prepared_view(lease):
+    """Vue préparée de la prévision d'un bail (forecast_share.py), construite une fois par version."""
+    return lease.derived("prepared_view", prepare_view)